@@ -0,0 +1,160 @@
+"""
+Headless batch processing.
+
+Runs a chain of core operations over every image in a directory (or glob),
+fanning the work out over a process pool and streaming results to an output
+directory.
+
+Example
+-------
+    python batch.py data/ -o out/ --op "noise:noise_type=Gaussian,amount=0.1" \\
+                                  --op "filter:filter_type=Median (3x3)"
+
+Operation chains can be saved with ``--save-pipeline chain.json`` and rerun (or
+replaced by hand-written graphs with several inputs per node) with
+``--pipeline chain.json``; the GUI uses the same pipeline engine (core/pipeline.py).
+
+Gigapixel images: ``--tile 2048`` processes each image tile by tile through
+memory-mapped ``.npy`` files (see core/tiled.py); write ``--ext .npy`` to keep
+the result memory-mapped too.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import cv2
+from core.cache import LRUCache
+from core.operations import OPERATIONS, parse_operation
+from core.pipeline import Pipeline
+from core.tiled import check_tileable, open_image_memmap, run_chain_tiled, tile_halo
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".npy")
+
+
+def collect_inputs(source: str) -> list:
+    """Expand a directory or glob pattern into a sorted list of image paths."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source)
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def _init_worker():
+    # One process per core already; keep OpenCV from spawning its own threads on top.
+    cv2.setNumThreads(1)
+
+
+def process_one(path: str, definition: dict, out_dir: str, ext, tile: int = None) -> tuple:
+    """
+    Load, process and write a single image through the pipeline ``definition``
+    (``Pipeline.to_dict()``). Returns (path, out_path, seconds, megapixels).
+    """
+    # every image is different: no point keeping results once this image is written
+    pipeline = Pipeline.from_dict(definition, cache=LRUCache(max_bytes=0))
+    start = time.perf_counter()
+    stem, src_ext = os.path.splitext(os.path.basename(path))
+    out_path = os.path.join(out_dir, stem + (ext or src_ext))
+
+    if tile:
+        with tempfile.TemporaryDirectory(dir=out_dir) as work_dir:
+            image = open_image_memmap(path, work_dir)
+            shape = image.shape
+            result = run_chain_tiled(image, pipeline.to_chain(), tile, work_dir)
+            _write(out_path, result)
+            # close the maps before their files are removed (Windows cannot delete open files)
+            del image, result
+    else:
+        image = np.load(path) if path.lower().endswith(".npy") else cv2.imread(path)
+        if image is None:
+            raise FileNotFoundError(f"Image not found at path: {path}")
+        shape = image.shape
+        pipeline.set_source(image, key=path)
+        _write(out_path, pipeline.result())
+    megapixels = shape[0] * shape[1] / 1e6
+    return path, out_path, time.perf_counter() - start, megapixels
+
+
+def _write(out_path: str, result: np.ndarray):
+    if out_path.lower().endswith(".npy"):
+        np.save(out_path, result)           # streams a memmap without loading it whole
+    elif not cv2.imwrite(out_path, np.asarray(result)):
+        raise OSError(f"Could not write {out_path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run core image operations over many images in parallel.")
+    parser.add_argument("input", help="input directory or glob pattern (quote globs)")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--op", dest="ops", action="append", default=[], metavar="NAME:K=V,...",
+                        help=f"operation to apply, repeatable, in order ({', '.join(OPERATIONS)})")
+    parser.add_argument("--pipeline", default=None, metavar="FILE",
+                        help="run the pipeline saved in FILE (JSON) instead of --op")
+    parser.add_argument("--save-pipeline", default=None, metavar="FILE",
+                        help="write the --op chain as a pipeline JSON file")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--ext", default=None, help="output extension, e.g. .png (default: keep input's)")
+    parser.add_argument("--tile", type=int, default=None, metavar="N",
+                        help="process each image in N x N tiles through memory-mapped files "
+                             "(for images larger than RAM; frequency, hybrid and Canny cannot be tiled)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not (args.pipeline or args.ops):
+        print("error: at least one --op (or --pipeline) is required", file=sys.stderr)
+        return 2
+    try:
+        if args.pipeline:
+            pipeline = Pipeline.load(args.pipeline)
+        else:
+            pipeline = Pipeline.from_chain([parse_operation(spec) for spec in args.ops])
+        # rejected once here rather than once per image in the workers
+        for node in pipeline.to_dict()["nodes"]:
+            if node["op"] == "filter":
+                tile_halo("filter", node["params"])     # e.g. "Median (4x4)"
+        if args.tile:
+            check_tileable(pipeline.to_chain())
+    except (OSError, ValueError) as exc:    # unknown operation, malformed parameter or pipeline file
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    if args.save_pipeline:
+        pipeline.save(args.save_pipeline)
+    definition = pipeline.to_dict()
+    paths = collect_inputs(args.input)
+    if not paths:
+        print(f"error: no images found in {args.input!r}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    failures = 0
+    total_mp = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker) as pool:
+        futures = {pool.submit(process_one, p, definition, args.output, args.ext, args.tile): p for p in paths}
+        for future in as_completed(futures):
+            try:
+                _, out_path, seconds, mp = future.result()
+            except Exception as exc:
+                failures += 1
+                print(f"FAIL {futures[future]}: {exc}", file=sys.stderr)
+                continue
+            total_mp += mp
+            print(f"{out_path}  {seconds * 1000:8.1f} ms  {mp / seconds:7.2f} MP/s")
+    elapsed = time.perf_counter() - start
+
+    done = len(paths) - failures
+    print(f"\n{done}/{len(paths)} images in {elapsed:.2f} s  "
+          f"({done / elapsed:.2f} img/s, {total_mp / elapsed:.2f} MP/s, {args.jobs} workers)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
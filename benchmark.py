@@ -0,0 +1,275 @@
+"""
+Benchmarks for the core operations.
+
+Times every core operation on gray and colour inputs of several sizes (and on
+the sample images in data/), reporting wall time, throughput and peak memory.
+Results are written as JSON; ``--compare`` checks them against a saved baseline
+and exits non-zero when a case got slower than the threshold allows.
+
+Example
+-------
+    python benchmark.py --sizes 256 1024 4K -o baseline.json
+    python benchmark.py --sizes 256 1024 4K --compare baseline.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import cv2
+from core.image_manager import ImageManager
+from core import filters, edges, noise, frequency, hybrid, sweep
+from core.histogram import Histogram
+from core.normalize import normalize_image
+from core.statistics import clear_stats_cache
+
+SIZES = {
+    "256": (256, 256),
+    "512": (512, 512),
+    "1024": (1024, 1024),
+    "2048": (2048, 2048),
+    "4K": (2160, 3840),
+    "8K": (4320, 7680),
+}
+DEFAULT_SIZES = ("256", "1024", "2048")
+
+
+def _gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def _second_image(image):
+    # hybrid partner: same content shifted, so both inputs have realistic spectra
+    return np.ascontiguousarray(np.roll(image, (image.shape[0] // 7, image.shape[1] // 5), axis=(0, 1)))
+
+
+# ---- cases ----
+# name → (func(image), kinds) where kinds says which inputs the case accepts
+
+CASES = {
+    "convolve 3x3":          (lambda im: ImageManager.convolve(im, np.arange(9.0).reshape(3, 3)), "gray color"),
+    "convolve 15x15":        (lambda im: ImageManager.convolve(im, np.arange(225.0).reshape(15, 15)), "gray color"),
+    "convolve 15x15 sep":    (lambda im: ImageManager.convolve(im, filters.gaussian_kernel(15)), "gray color"),
+    "filter average 3":      (lambda im: filters.average_filter(im, 3), "gray color"),
+    "filter average 15":     (lambda im: filters.average_filter(im, 15), "gray color"),
+    "filter gaussian 3":     (lambda im: filters.gaussian_filter(im, 3), "gray color"),
+    "filter gaussian 15":    (lambda im: filters.gaussian_filter(im, 15), "gray color"),
+    "filter average 101":    (lambda im: filters.average_filter(im, 101), "gray color"),
+    "filter fast gaussian 15":  (lambda im: filters.fast_gaussian_filter(im, 15), "gray color"),
+    "filter fast gaussian 101": (lambda im: filters.fast_gaussian_filter(im, 101), "gray color"),
+    "filter median 3":       (lambda im: filters.median_filter(im, 3), "gray color"),
+    "filter median 9":       (lambda im: filters.median_filter(im, 9), "gray color"),
+    "filter median 31":      (lambda im: filters.median_filter(im, 31), "gray color"),
+    "edges sobel":           (lambda im: edges.sobel_edge_detection(_gray(im)), "gray color"),
+    "edges prewitt":         (lambda im: edges.prewitt_edge_detection(_gray(im)), "gray color"),
+    "edges roberts":         (lambda im: edges.roberts_edge_detection(_gray(im)), "gray color"),
+    "edges canny":           (lambda im: edges.canny_edge_detection(_gray(im)), "gray color"),
+    "noise gaussian":        (lambda im: noise.add_noise(im, "Gaussian", 0.1), "gray color"),
+    "noise uniform":         (lambda im: noise.add_noise(im, "Uniform", 0.1), "gray color"),
+    "noise salt & pepper":   (lambda im: noise.add_noise(im, "Salt & Pepper", 0.1), "gray color"),
+    "frequency ideal":       (lambda im: frequency.apply_frequency_filter(im, "ideal", "low", 30), "gray color"),
+    "frequency gaussian":    (lambda im: frequency.apply_frequency_filter(im, "gaussian", "high", 30), "gray color"),
+    "frequency butterworth": (lambda im: frequency.apply_frequency_filter(im, "butterworth", "low", 30, 2),
+                              "gray color"),
+    "frequency sweep x16":   (lambda im: sweep.frequency_sweep(im, "gaussian", "low", range(10, 170, 10)),
+                              "gray color"),
+    "hybrid":                (lambda im: hybrid.create_hybrid_image(im, _second_image(im), 30, 20), "gray color"),
+    "histogram gray":        (lambda im: Histogram.computeHistoGray(im), "gray"),
+    "histogram colour":      (lambda im: Histogram.computeHistoColored(im), "color"),
+    "cdf gray":              (lambda im: Histogram.compute_cdf_gray(Histogram.computeHistoGray(im)), "gray"),
+    "equalize":              (lambda im: Histogram.equalize_gray(im), "gray"),
+    "normalize":             (lambda im: normalize_image(im), "gray color"),
+}
+
+
+def clear_caches():
+    """Forget everything the core keeps between calls (masks, noise fields, statistics)."""
+    frequency.clear_mask_cache()
+    noise.clear_noise_cache()
+    clear_stats_cache()
+
+
+# ---- inputs ----
+
+def synthetic_image(shape: tuple, color: bool, seed: int = 0) -> np.ndarray:
+    """Deterministic test image: smooth structure plus fine texture (not pure noise)."""
+    rng = np.random.default_rng(seed)
+    h, w = shape
+    small = rng.random((max(h // 32, 2), max(w // 32, 2), 3 if color else 1), dtype=np.float32)
+    image = cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC).reshape(h, w, -1) * 200
+    image += rng.random(image.shape, dtype=np.float32) * 55
+    image = np.clip(image, 0, 255).astype(np.uint8)
+    return image if color else image[:, :, 0]
+
+
+def build_inputs(sizes, data_dir=None) -> list:
+    """List of (input name, image) pairs: synthetic gray/colour per size, then sample images."""
+    inputs = []
+    for size in sizes:
+        for color in (False, True):
+            inputs.append((f"{size} {'color' if color else 'gray'}", synthetic_image(SIZES[size], color)))
+    if data_dir:
+        for path in sorted(glob.glob(os.path.join(data_dir, "*"))):
+            image = cv2.imread(path)
+            if image is not None:
+                inputs.append((f"data/{os.path.basename(path)}", image))
+    return inputs
+
+
+# ---- measurement ----
+
+def measure(func, image, repeats: int, cold: bool, memory: bool) -> dict:
+    """
+    Time ``func(image)`` ``repeats`` times after one warm-up call. ``cold`` clears the
+    core caches and hands each call a fresh copy of the input, measuring first-call
+    cost instead of steady state. Statistics are memoized per input array, so they
+    are cleared before every call even when warm: otherwise the histogram, CDF,
+    normalize and equalize cases would time a dictionary lookup. Peak memory comes
+    from one extra tracemalloc-instrumented call, kept out of the timings.
+    """
+    func(image)
+    times = []
+    for _ in range(repeats):
+        arg = image
+        clear_stats_cache()
+        if cold:
+            clear_caches()
+            arg = image.copy()
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        arg = image
+        clear_stats_cache()
+        if cold:
+            clear_caches()
+            arg = image.copy()
+        tracemalloc.start()
+        try:
+            func(arg)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    megapixels = image.shape[0] * image.shape[1] / 1e6
+    best = min(times)
+    return {
+        "seconds_min": best,
+        "seconds_median": statistics.median(times),
+        "mp_per_s": megapixels / best if best > 0 else None,
+        "peak_bytes": peak,
+    }
+
+
+def run(inputs, case_names, repeats=5, cold=False, memory=True, log=print) -> dict:
+    results = []
+    for input_name, image in inputs:
+        kind = "color" if image.ndim == 3 else "gray"
+        for case in case_names:
+            func, kinds = CASES[case]
+            if kind not in kinds.split():
+                continue
+            entry = {"case": case, "input": input_name, "shape": list(image.shape)}
+            try:
+                entry.update(measure(func, image, repeats, cold, memory))
+            except Exception as exc:
+                entry["error"] = f"{type(exc).__name__}: {exc}"
+                log(f"{case:24s} {input_name:28s} ERROR {entry['error']}")
+            else:
+                peak = entry["peak_bytes"]
+                log(f"{case:24s} {input_name:28s} {entry['seconds_min'] * 1000:9.2f} ms "
+                    f"{entry['mp_per_s']:9.1f} MP/s"
+                    + (f" {peak / 2 ** 20:8.1f} MiB peak" if peak is not None else ""))
+            results.append(entry)
+    return {"meta": environment(repeats, cold), "results": results}
+
+
+def environment(repeats, cold) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeats": repeats,
+        "cold": cold,
+    }
+
+
+# ---- baseline comparison ----
+
+def compare(current: dict, baseline: dict, threshold: float, log=print) -> list:
+    """
+    Compare best times case by case. Returns the regressions: cases whose time
+    grew by more than ``threshold`` (0.1 = 10 %) over the baseline.
+    """
+    before = {(r["case"], r["input"]): r for r in baseline["results"] if "seconds_min" in r}
+    regressions = []
+    log(f"\n{'case':24s} {'input':28s} {'baseline':>11s} {'current':>11s} {'change':>8s}")
+    for r in current["results"]:
+        old = before.get((r["case"], r["input"]))
+        if old is None or "seconds_min" not in r:
+            continue
+        change = r["seconds_min"] / old["seconds_min"] - 1 if old["seconds_min"] > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append({"case": r["case"], "input": r["input"], "change": change})
+        log(f"{r['case']:24s} {r['input']:28s} {old['seconds_min'] * 1000:9.2f}ms "
+            f"{r['seconds_min'] * 1000:9.2f}ms {change:+8.1%}{flag}")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the core image operations.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), choices=list(SIZES),
+                        help=f"synthetic input sizes (default: {' '.join(DEFAULT_SIZES)})")
+    parser.add_argument("--data", default=None, metavar="DIR",
+                        help="also benchmark the images in DIR (e.g. data/)")
+    parser.add_argument("-k", "--filter", default=None, metavar="TEXT",
+                        help="only run cases whose name contains TEXT")
+    parser.add_argument("-r", "--repeats", type=int, default=5, help="timed calls per case (default: 5)")
+    parser.add_argument("--cold", action="store_true",
+                        help="clear core caches and copy the input before every call")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("-o", "--output", default=None, help="write results as JSON to this file")
+    parser.add_argument("--compare", default=None, metavar="BASELINE",
+                        help="compare against a JSON file written by -o; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown before a case counts as a regression (default: 0.10)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    cases = [name for name in CASES if args.filter is None or args.filter in name]
+    if not cases:
+        print(f"error: no benchmark matches {args.filter!r}", file=sys.stderr)
+        return 2
+
+    report = run(build_inputs(args.sizes, args.data), cases, args.repeats, args.cold, not args.no_memory)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
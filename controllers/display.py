@@ -0,0 +1,127 @@
+import threading
+import weakref
+import numpy as np
+import cv2
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import Qt, QSize
+from core import profiling
+
+# Format_BGR888 needs Qt 5.14; older builds convert the (already scaled) image instead
+_HAS_BGR888 = hasattr(QImage, "Format_BGR888")
+
+
+def to_qimage(image: np.ndarray) -> QImage:
+    """
+    QImage over the pixels of a BGR or gray uint8 array, without a conversion
+    copy. The array is referenced by the QImage (``_array``), so the buffer lives
+    at least as long as the image. Arrays that are not C-contiguous (crops,
+    reversed rows such as ``image[::-1]``, channel views) are copied once.
+    """
+    if image.ndim == 3 and not _HAS_BGR888:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        fmt = QImage.Format_RGB888
+    elif image.ndim == 3:
+        fmt = QImage.Format_BGR888
+    else:
+        fmt = QImage.Format_Grayscale8
+    # QImage takes one contiguous buffer with a positive line stride
+    if not image.flags.c_contiguous:
+        image = np.ascontiguousarray(image)
+    h, w = image.shape[:2]
+    qimg = QImage(image.data, w, h, image.strides[0], fmt)
+    qimg._array = image
+    return qimg
+
+
+class PixmapCache:
+    """
+    Scaled pixmaps keyed by (image, target size), so showing the same array again
+    in a label of the same size (tab switches, redisplays after undo) costs a
+    dictionary lookup. Arrays are identified like in the statistics service: by
+    object, never modified in place; entries go away when the array does. The
+    cache is bounded by pixmap bytes and only used from the GUI thread.
+    """
+
+    def __init__(self, max_bytes: int = 128 << 20):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = {}          # (id(image), w, h) → (pixmap, nbytes), oldest first
+        self._tracked = set()       # ids with a finalizer registered
+        self._dead = []             # ids of collected arrays, purged on the GUI thread
+        self._dead_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def pixmap(self, image: np.ndarray, size: QSize) -> QPixmap:
+        """``image`` scaled to fit ``size`` (aspect ratio kept), as a pixmap."""
+        self._purge()
+        h, w = image.shape[:2]
+        target = QSize(w, h).scaled(size, Qt.KeepAspectRatio)
+        tw, th = max(target.width(), 1), max(target.height(), 1)
+        key = (id(image), tw, th)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.hits += 1
+            self._entries[key] = entry          # most recently used last
+            return entry[0]
+        self.misses += 1
+        pixmap = self._render(image, tw, th)
+        self._store(image, key, pixmap, tw * th * 4)
+        return pixmap
+
+    @staticmethod
+    def _render(image: np.ndarray, width: int, height: int) -> QPixmap:
+        # scale the array first: only the displayed pixels are converted to a pixmap
+        with profiling.stage("scale"):
+            if (width, height) != (image.shape[1], image.shape[0]):
+                shrink = width < image.shape[1]
+                image = cv2.resize(image, (width, height),
+                                   interpolation=cv2.INTER_AREA if shrink else cv2.INTER_LINEAR)
+        with profiling.stage("qimage"):
+            return QPixmap.fromImage(to_qimage(image))
+
+    def _store(self, image, key, pixmap, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        if key[0] not in self._tracked:
+            self._tracked.add(key[0])
+            weakref.finalize(image, self._forget, key[0])
+        self._entries[key] = (pixmap, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self.current_bytes -= self._entries.pop(oldest)[1]
+
+    def _forget(self, image_id):
+        # may run on a worker thread that dropped the last reference: pixmaps are released later
+        with self._dead_lock:
+            self._dead.append(image_id)
+
+    def _purge(self):
+        with self._dead_lock:
+            dead, self._dead = set(self._dead), []
+        if not dead:
+            return
+        self._tracked -= dead
+        for key in [k for k in self._entries if k[0] in dead]:
+            self.current_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.current_bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+_PIXMAPS = PixmapCache()
+
+
+def show_image(image: np.ndarray, label):
+    """Show a BGR or gray uint8 ``image`` in ``label``, scaled to fit."""
+    label.setPixmap(_PIXMAPS.pixmap(image, label.size()))
+
+
+def pixmap_cache_stats() -> dict:
+    return _PIXMAPS.stats()
@@ -0,0 +1,94 @@
+import numpy as np
+from PyQt5.QtWidgets import QVBoxLayout
+from PyQt5.QtCore import QTimer
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from core import profiling
+
+_BINS = np.arange(257)
+
+_STYLE = {
+    "histogram": dict(ylabel='Frequency', title='Histogram'),
+    "cdf":       dict(ylabel='Cumulative Probability', title='CDF'),
+}
+
+
+class HistogramView:
+    """
+    One persistent FigureCanvas per widget. Panels (one per series) are created on
+    the first update and afterwards only their data is replaced: histograms are a
+    single filled step patch instead of 256 bar patches, CDFs a single line.
+    Redraws are coalesced through a short single-shot timer.
+    """
+
+    REDRAW_INTERVAL_MS = 30
+
+    def __init__(self, widget, kind: str = "histogram"):
+        if kind not in _STYLE:
+            raise ValueError(f"Unknown histogram view kind: {kind!r}")
+        self.kind = kind
+        self.figure = Figure(figsize=(5, 4))
+        self.canvas = FigureCanvas(self.figure)
+        if not widget.layout():
+            QVBoxLayout(widget)
+        widget.layout().addWidget(self.canvas)
+
+        self._artists = []
+        self._layout_key = None
+        self._timer = QTimer(self.canvas)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.REDRAW_INTERVAL_MS)
+        self._timer.timeout.connect(self._redraw)
+
+    def update(self, series):
+        """
+        Show ``series``, a list of (values, colour, label) with 256 values each,
+        one panel per entry. Same labels as last time → in-place data update.
+        """
+        key = tuple((color, label) for _, color, label in series)
+        if key != self._layout_key:
+            self._build(series)
+            self._layout_key = key
+
+        for (values, _, _), (ax, artist) in zip(series, self._artists):
+            if self.kind == "histogram":
+                artist.set_data(values, _BINS)
+            else:
+                artist.set_ydata(values)
+            top = float(np.max(values)) if len(values) else 1.0
+            ax.set_ylim(0, (top or 1.0) * 1.05)
+        self._schedule_redraw()
+
+    def _build(self, series):
+        self.figure.clear()
+        self._artists = []
+        style = _STYLE[self.kind]
+        count = len(series)
+        for i, (values, color, label) in enumerate(series):
+            ax = self.figure.add_subplot(count, 1, i + 1)
+            if self.kind == "histogram":
+                artist = ax.stairs(values, _BINS, fill=True, color=color, alpha=0.6)
+            else:
+                (artist,) = ax.plot(np.arange(256), values, color=color)
+            ax.set_xlim(0, 256)
+            ax.set_title(f"{label} {style['title']}", fontsize=9)
+            ax.grid(True)
+            if i == count - 1:
+                ax.set_xlabel('Pixel Intensity')
+            else:
+                ax.tick_params(labelbottom=False)
+            ax.set_ylabel(style['ylabel'], fontsize=8)
+            self._artists.append((ax, artist))
+        self.figure.tight_layout()
+
+    def _schedule_redraw(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _redraw(self):
+        if not profiling.is_enabled():
+            self.canvas.draw_idle()
+            return
+        # drawn synchronously here so the matplotlib time is measured
+        with profiling.operation(f"{self.kind} render"), profiling.stage("matplotlib"):
+            self.canvas.draw()
@@ -1,17 +1,28 @@
 from PyQt5.QtWidgets import QFileDialog
 from PyQt5.QtCore import Qt, QEvent, QObject
-import cv2
-from core.hybrid import create_hybrid_image
+from core.hybrid import HybridBuilder
+from core.image_manager import ImageManager
+from core.preview import proxy_for, proxy_pyramid
 from controllers.main_controller import MainController
+from controllers.job_scheduler import JobScheduler
+from controllers.tab_history import TabHistory
 
 
 class HybridController(QObject):
-    def __init__(self, window):
+    def __init__(self, window, scheduler=None):
         super().__init__()
         self.window = window
+        self.scheduler = scheduler or JobScheduler(self)
+        # created (full-resolution) hybrids, for undo/redo in this tab
+        self.history = TabHistory({"hybrid": self._restore_hybrid})
 
         self.image1 = None
         self.image2 = None
+        # keeps resized inputs and their spectra between parameter changes
+        self.builder = HybridBuilder()
+        # same for display-sized proxies of the inputs, used by the live preview
+        self.preview_builder = HybridBuilder()
+        self._preview_sources = [None, None]
 
         # ── Setup labels using MainController's helper ──
         MainController._setup_label(self, self.window.hybrid_label_img1, dashed=True, clickable=True)
@@ -41,6 +52,15 @@ class HybridController(QObject):
         # ── Button ──
         self.window.hybrid_btn_create.clicked.connect(self.create_hybrid)
 
+        # ── Live preview (on proxies) once a hybrid has been created; Create recomputes at full resolution ──
+        self._live = False
+        for slider in (self.window.hybrid_slider_cutoff1,
+                       self.window.hybrid_slider_cutoff2,
+                       self.window.hybrid_slider_alpha):
+            slider.valueChanged.connect(self._update_live)
+        for combo in (self.window.hybrid_combo_filter1, self.window.hybrid_combo_filter2):
+            combo.currentIndexChanged.connect(self._update_live)
+
     # ──────────────────────────────────────────────
     #  Double-click to load images
     # ──────────────────────────────────────────────
@@ -58,9 +78,14 @@ class HybridController(QObject):
         )
         if not path:
             return
-        img = cv2.imread(path)
-        if img is None:
-            return
+        self.scheduler.submit(f"hybrid image {slot}", ImageManager.decode, path,
+                              on_done=lambda img: self._on_image_loaded(slot, img),
+                              on_error=self._show_error)
+
+    def _on_image_loaded(self, slot: int, img):
+        self.scheduler.cancel("hybrid")
+        self.builder.set_image(slot, img)
+        self._live = False
         if slot == 1:
             self.image1 = img
             MainController.display_image(self, img, self.window.hybrid_label_img1)
@@ -71,26 +96,66 @@ class HybridController(QObject):
     # ──────────────────────────────────────────────
     #  Create hybrid and show result
     # ──────────────────────────────────────────────
+    def _settings(self) -> dict:
+        return dict(
+            low_cutoff=self.window.hybrid_slider_cutoff1.value(),
+            low_pass1=self.window.hybrid_combo_filter1.currentText() == "Low Pass",
+            high_cutoff=self.window.hybrid_slider_cutoff2.value(),
+            low_pass2=self.window.hybrid_combo_filter2.currentText() == "Low Pass",
+            alpha=self.window.hybrid_slider_alpha.value() / 100.0,
+        )
+
     def create_hybrid(self):
         if self.image1 is None or self.image2 is None:
             return
 
-        cutoff1   = self.window.hybrid_slider_cutoff1.value()
-        low_pass1 = self.window.hybrid_combo_filter1.currentText() == "Low Pass"
-
-        cutoff2   = self.window.hybrid_slider_cutoff2.value()
-        low_pass2 = self.window.hybrid_combo_filter2.currentText() == "Low Pass"
+        self.scheduler.submit(
+            "hybrid",
+            self.builder.create,
+            **self._settings(),
+            on_done=self._show_created_hybrid,
+            on_error=self._show_error,
+        )
 
-        alpha = self.window.hybrid_slider_alpha.value() / 100.0
+    def preview_hybrid(self):
+        if self.image1 is None or self.image2 is None:
+            return
 
-        hybrid, _, _ = create_hybrid_image(
-            self.image1,
-            self.image2,
-            low_cutoff=cutoff1,
-            high_cutoff=cutoff2,
-            alpha=alpha,
-            low_pass1=low_pass1,
-            low_pass2=low_pass2,
+        # image1 sets the working size; image2 only needs a level at least that large
+        proxy1, _ = proxy_for(self.image1, self.window.hybrid_label_result)
+        proxy2, _ = proxy_pyramid(self.image2).for_size(proxy1.shape[1], proxy1.shape[0])
+        for slot, proxy in ((1, proxy1), (2, proxy2)):
+            if self._preview_sources[slot - 1] is not proxy:
+                self._preview_sources[slot - 1] = proxy
+                self.preview_builder.set_image(slot, proxy)
+
+        # cutoffs count cycles per image, which downscaling does not change: no rescaling
+        self.scheduler.submit(
+            "hybrid",
+            self.preview_builder.create,
+            **self._settings(),
+            on_done=self._show_hybrid,
+            on_error=self._show_error,
         )
 
-        MainController.display_image(self, hybrid, self.window.hybrid_label_result)
\ No newline at end of file
+    def _show_created_hybrid(self, result):
+        self.history.push(result[0], "hybrid")
+        self._show_hybrid(result)
+
+    def _restore_hybrid(self, hybrid):
+        if hybrid is None:
+            self.window.hybrid_label_result.clear()
+        else:
+            MainController.display_image(self, hybrid, self.window.hybrid_label_result)
+
+    def _show_hybrid(self, result):
+        hybrid, _, _ = result
+        MainController.display_image(self, hybrid, self.window.hybrid_label_result)
+        self._live = True
+
+    def _show_error(self, message):
+        self.window.statusbar.showMessage(message, 5000)
+
+    def _update_live(self, *_):
+        if self._live:
+            self.preview_hybrid()
\ No newline at end of file
@@ -0,0 +1,191 @@
+import logging
+from PyQt5.QtWidgets import QProgressBar, QLabel
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from core import profiling
+
+log = logging.getLogger(__name__)
+
+
+class _JobSignals(QObject):
+    # channel, generation, result / error message, profiling.Operation (or None)
+    finished = pyqtSignal(str, int, object, object)
+    failed = pyqtSignal(str, int, str, object)
+
+
+class _Job(QRunnable):
+    def __init__(self, channel, generation, func, args, kwargs, signals):
+        super().__init__()
+        self.channel = channel
+        self.generation = generation
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+
+    def run(self):
+        # the operation stays open until the GUI-thread callback has displayed the result
+        operation = profiling.begin(self.channel)
+        try:
+            with profiling.activate(operation):
+                result = self.func(*self.args, **self.kwargs)
+        except Exception as exc:  # reported back on the GUI thread
+            self.signals.failed.emit(self.channel, self.generation, f"{type(exc).__name__}: {exc}", operation)
+        else:
+            self.signals.finished.emit(self.channel, self.generation, result, operation)
+
+
+class JobScheduler(QObject):
+    """
+    Runs core operations on a QThreadPool, off the GUI thread.
+
+    Work is grouped into named channels ("noise", "edges", ...). Each channel runs
+    at most one job at a time and keeps at most one pending job: submitting while
+    a job is running replaces whatever was pending, so a burst of slider ticks
+    computes only the value that is current when the worker frees up. Results are
+    delivered on the GUI thread through ``on_done`` / ``on_error`` callbacks;
+    results of jobs older than the last ``cancel`` are dropped. Failures of jobs
+    without ``on_error`` are logged and emitted as ``jobFailed``.
+    """
+
+    busyChanged = pyqtSignal(str, bool)
+    jobFailed = pyqtSignal(str, str)        # channel, error message
+
+    def __init__(self, parent=None, pool: QThreadPool = None):
+        super().__init__(parent)
+        if pool is None:
+            # not the global pool: Qt itself uses that one (e.g. for smooth pixmap
+            # scaling on the GUI thread) and would otherwise queue behind our jobs
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(max(2, QThreadPool.globalInstance().maxThreadCount()))
+        self._pool = pool
+        self._signals = _JobSignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._generation = {}   # channel → last submitted generation
+        self._floor = {}        # channel → results at or below this generation are stale
+        self._running = {}      # channel → generation of the running job
+        self._pending = {}      # channel → job waiting for the running one
+        self._callbacks = {}    # (channel, generation) → (on_done, on_error)
+
+    def submit(self, channel: str, func, *args, on_done=None, on_error=None, **kwargs) -> int:
+        generation = self._generation.get(channel, 0) + 1
+        self._generation[channel] = generation
+        self._callbacks[(channel, generation)] = (on_done, on_error)
+        job = _Job(channel, generation, func, args, kwargs, self._signals)
+
+        if channel in self._running:
+            replaced = self._pending.pop(channel, None)
+            if replaced is not None:
+                self._callbacks.pop((channel, replaced.generation), None)
+            self._pending[channel] = job
+        else:
+            self._start(job)
+        return generation
+
+    def cancel(self, channel: str):
+        """Drop the pending job and ignore the result of the running one."""
+        job = self._pending.pop(channel, None)
+        if job is not None:
+            self._callbacks.pop((channel, job.generation), None)
+        self._floor[channel] = self._generation.get(channel, 0)
+
+    def is_busy(self, channel: str) -> bool:
+        return channel in self._running
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until the pool is idle (used on shutdown and by scripts)."""
+        return self._pool.waitForDone(msecs)
+
+    def _start(self, job: _Job):
+        self._running[job.channel] = job.generation
+        self.busyChanged.emit(job.channel, True)
+        self._pool.start(job)
+
+    def _finish(self, channel: str, generation: int) -> tuple:
+        callbacks = self._callbacks.pop((channel, generation), (None, None))
+        del self._running[channel]
+        stale = generation <= self._floor.get(channel, 0)
+        return callbacks, stale
+
+    def _next(self, channel: str):
+        job = self._pending.pop(channel, None)
+        if job is not None:
+            self._start(job)
+        else:
+            self.busyChanged.emit(channel, False)
+
+    def _on_finished(self, channel, generation, result, operation):
+        (on_done, _), stale = self._finish(channel, generation)
+        try:
+            if not stale and on_done is not None:
+                with profiling.activate(operation):
+                    on_done(result)
+        finally:
+            if not stale:
+                profiling.finish(operation)
+            self._next(channel)
+
+    def _on_failed(self, channel, generation, message, operation):
+        (_, on_error), stale = self._finish(channel, generation)
+        try:
+            if not stale:
+                if on_error is not None:
+                    on_error(message)
+                else:
+                    log.warning("%s job failed: %s", channel, message)
+                    self.jobFailed.emit(channel, message)
+        finally:
+            self._next(channel)
+
+
+class BusyIndicator(QObject):
+    """
+    Shows scheduler activity: an indeterminate progress bar and the busy channels
+    in the status bar, plus a busy cursor and a marker on the affected tab.
+    """
+
+    MARKER = " ⏳"
+
+    def __init__(self, window, scheduler: JobScheduler):
+        super().__init__(window)
+        self.window = window
+        self._tabs = {}          # channel → tab page widget
+        self._busy = set()
+
+        self._label = QLabel()
+        self._bar = QProgressBar()
+        self._bar.setRange(0, 0)               # indeterminate
+        self._bar.setMaximumWidth(160)
+        self._bar.setTextVisible(False)
+        window.statusbar.addPermanentWidget(self._label)
+        window.statusbar.addPermanentWidget(self._bar)
+        self._label.hide()
+        self._bar.hide()
+
+        scheduler.busyChanged.connect(self._on_busy_changed)
+
+    def track(self, channel: str, tab_page):
+        """Mark ``tab_page`` (a page of window.tabWidget) busy while ``channel`` is running."""
+        self._tabs[channel] = tab_page
+
+    def _on_busy_changed(self, channel, busy):
+        if busy:
+            self._busy.add(channel)
+        else:
+            self._busy.discard(channel)
+
+        page = self._tabs.get(channel)
+        if page is not None:
+            tabs = self.window.tabWidget
+            index = tabs.indexOf(page)
+            page_busy = any(self._tabs.get(c) is page for c in self._busy)
+            title = tabs.tabText(index).replace(self.MARKER, "")
+            tabs.setTabText(index, title + self.MARKER if page_busy else title)
+            if page_busy:
+                page.setCursor(Qt.BusyCursor)
+            else:
+                page.unsetCursor()
+
+        self._label.setText("Working: " + ", ".join(sorted(self._busy)) if self._busy else "")
+        self._label.setVisible(bool(self._busy))
+        self._bar.setVisible(bool(self._busy))
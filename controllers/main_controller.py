@@ -1,13 +1,23 @@
-from PyQt5.QtWidgets import QFileDialog, QVBoxLayout
-from PyQt5.QtGui import QImage, QPixmap, QCursor
+from PyQt5.QtWidgets import QFileDialog, QShortcut
+from PyQt5.QtGui import QCursor, QKeySequence
 from PyQt5.QtCore import Qt, QEvent, QObject
 import cv2
 import os
+import numpy as np
 from core.image_manager import ImageManager
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from core.histogram import Histogram
+from core.statistics import image_stats
 from core.edges import sobel_edge_detection, prewitt_edge_detection, roberts_edge_detection, canny_edge_detection
 from core.normalize import normalize_image
+from core.preview import proxy_for
+from core.operations import op_gray
+from core.image_io import read_preview
+from core import profiling
+from controllers.job_scheduler import JobScheduler, BusyIndicator
+from controllers.histogram_view import HistogramView
+from controllers.display import show_image
+from controllers.tab_history import TabHistory
+from controllers.profile_view import ProfileStatus
 
 
 def load_stylesheet(filename):
@@ -24,11 +34,31 @@ class MainController(QObject):
         self.manager = ImageManager()
         self.equalization_image = None
         self.is_dark = True
+        self._histogram_views = {}
+
+        # Background processing, shared with the other controllers
+        self.scheduler = JobScheduler(self)
+        self.busy_indicator = BusyIndicator(self.window, self.scheduler)
+        self.busy_indicator.track("load", self.window.tab)
+        self.busy_indicator.track("load normalize", self.window.tab_5)
+        self.busy_indicator.track("edges", self.window.tab_3)
+        self.busy_indicator.track("normalize", self.window.tab_5)
+        self.busy_indicator.track("equalize", self.window.tab_5)
+        # failures of jobs submitted without on_error still reach the user
+        self.scheduler.jobFailed.connect(lambda channel, message: self._show_error(f"{channel}: {message}"))
+        # Ctrl+Z / Ctrl+Y on these tabs step through their applied results;
+        # elsewhere through the loaded image's edits
+        self.edge_history = TabHistory({"edges": self._restore_edges})
+        self.tab_histories = {self.window.tab_3: self.edge_history}
+        # Stage timings of the last operation (IMAGE_APP_PROFILE=1)
+        self.profile_status = ProfileStatus(self.window) if profiling.is_enabled() else None
 
         # Input tab
         self.window.btn_reset.clicked.connect(self.reset_image)
         self.window.btn_convert_gray.clicked.connect(self.convert_to_gray)
         self.window.btn_toggle_theme.clicked.connect(self.toggle_theme)
+        QShortcut(QKeySequence.Undo, self.window, self.undo)
+        QShortcut(QKeySequence.Redo, self.window, self.redo)
         self._setup_label(self.window.InputImage, dashed=True, clickable=True)
 
         # Edge detection tab
@@ -50,53 +80,40 @@ class MainController(QObject):
             label.setCursor(QCursor(Qt.PointingHandCursor))
             label.installEventFilter(self)
 
-    def _set_canvas(self, widget, figures):
-        """Clear widget layout and populate with one or more FigureCanvas items."""
-        self._clear_layout(widget)
-        if not widget.layout():
-            QVBoxLayout(widget)
-        for fig in figures:
-            widget.layout().addWidget(FigureCanvas(fig))
-
-    def _clear_layout(self, widget):
-        if widget.layout():
-            while widget.layout().count():
-                item = widget.layout().takeAt(0)
-                if item.widget():
-                    item.widget().deleteLater()
+    def _histogram_view(self, widget, kind="histogram"):
+        """Persistent HistogramView for ``widget``, created on first use."""
+        view = self._histogram_views.get(widget)
+        if view is None:
+            view = self._histogram_views[widget] = HistogramView(widget, kind)
+        return view
+
+    def _show_gray_histogram(self, widget, hist):
+        self._histogram_view(widget).update([(hist, 'black', 'Grayscale')])
 
     def display_image(self, image, label):
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        h, w, ch = image_rgb.shape
-        qimg = QImage(image_rgb.data, w, h, ch * w, QImage.Format_RGB888)
-        label.setPixmap(QPixmap.fromImage(qimg).scaled(label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        show_image(image, label)
 
     def display_gray_image(self, gray_image, label):
-        h, w = gray_image.shape
-        qimg = QImage(gray_image.data, w, h, w, QImage.Format_Grayscale8)
-        label.setPixmap(QPixmap.fromImage(qimg).scaled(label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        show_image(gray_image, label)
 
     # ── Histogram helpers ──────────────────────────────────────
 
     def _show_rgb_histograms(self, image):
-        histB, histG, histR = Histogram.computeHistoColored(image)
-        cdfB, cdfG, cdfR   = Histogram.compute_cdf_colored(histB, histG, histR)
-        self._set_canvas(self.window.InputHistogram, [
-            Histogram.plot_colored_histogram(histB, histG, histR, True, False, False),
-            Histogram.plot_colored_histogram(histB, histG, histR, False, True, False),
-            Histogram.plot_colored_histogram(histB, histG, histR, False, False, True),
+        stats = image_stats(image)
+        histB, histG, histR = stats.hists
+        cdfB, cdfG, cdfR   = stats.cdfs
+        self._histogram_view(self.window.InputHistogram).update([
+            (histB, 'blue', 'Blue'), (histG, 'green', 'Green'), (histR, 'red', 'Red'),
         ])
-        self._set_canvas(self.window.InputDistribution, [
-            Histogram.plot_cdf_colored(cdfB, cdfG, cdfR, True, False, False),
-            Histogram.plot_cdf_colored(cdfB, cdfG, cdfR, False, True, False),
-            Histogram.plot_cdf_colored(cdfB, cdfG, cdfR, False, False, True),
+        self._histogram_view(self.window.InputDistribution, "cdf").update([
+            (cdfB, 'blue', 'Blue'), (cdfG, 'green', 'Green'), (cdfR, 'red', 'Red'),
         ])
 
     def _show_gray_histograms(self, gray_image):
-        hist = Histogram.computeHistoGray(gray_image)
-        cdf  = Histogram.compute_cdf_gray(hist)
-        self._set_canvas(self.window.InputHistogram,    [Histogram.plot_gray_histogram(hist)])
-        self._set_canvas(self.window.InputDistribution, [Histogram.plot_cdf_gray(cdf)])
+        stats = image_stats(gray_image)
+        hist, cdf = stats.hists[0], stats.cdfs[0]
+        self._show_gray_histogram(self.window.InputHistogram, hist)
+        self._histogram_view(self.window.InputDistribution, "cdf").update([(cdf, 'black', 'Grayscale')])
 
     # ── Event filter ───────────────────────────────────────────
 
@@ -110,14 +127,35 @@ class MainController(QObject):
 
     # ── Input tab ─────────────────────────────────────────────
 
+    def _show_error(self, message):
+        self.window.statusbar.showMessage(message, 5000)
+
     def load_image(self):
         path, _ = QFileDialog.getOpenFileName(self.window, "Select Image", "", "Images (*.png *.jpg *.bmp *.jpeg)")
         if not path:
             return
-        self.manager.read_image(path)
+        # a reduced decode shows up first; the full image replaces it when ready
+        label = self.window.InputImage
+        self.scheduler.submit("load preview", read_preview, path, max(label.width(), label.height()),
+                              on_done=self._show_preview,
+                              on_error=lambda message: None)    # the full load reports it
+        self.scheduler.submit("load", ImageManager.decode, path,
+                              on_done=self._on_image_loaded, on_error=self._show_error)
+
+    def _show_preview(self, preview):
+        if preview is not None:
+            self.display_image(preview, self.window.InputImage)
+
+    def _on_image_loaded(self, image):
+        self.scheduler.cancel("load preview")
+        self.manager.set_image(image)
+        # results computed from the previous image are no longer wanted
+        for channel in ("edges", "noise", "filter", "noise apply", "filter apply"):
+            self.scheduler.cancel(channel)
+        self.edge_history.clear()
         self.display_image(self.manager.current_image, self.window.InputImage)
         self._show_rgb_histograms(self.manager.original_image)
-        self.equalization_image = self.manager.gray_image.copy()
+        self.equalization_image = self.manager.gray_image   # shared (never modified in place) → shares its statistics
         
         # Clear edge detection outputs
         self.window.edge_output_image.clear()
@@ -131,16 +169,36 @@ class MainController(QObject):
     def reset_image(self):
         img = self.manager.reset_image()
         if img is not None:
-            self.display_image(img, self.window.InputImage)
-            self._show_rgb_histograms(self.manager.original_image)
+            self._show_current_image()
 
     def convert_to_gray(self):
         if self.manager.gray_image is None:
             return
-        gray_bgr = cv2.cvtColor(self.manager.gray_image, cv2.COLOR_GRAY2BGR)
-        self.manager.current_image = gray_bgr
-        self.display_image(gray_bgr, self.window.InputImage)
-        self._show_gray_histograms(self.manager.gray_image)
+        # a single-channel state: its histograms come straight from the stored array
+        self.manager.apply(op_gray, "gray")
+        self._show_current_image()
+
+    def undo(self):
+        tab_history = self.tab_histories.get(self.window.tabWidget.currentWidget())
+        if tab_history is not None:
+            tab_history.undo()
+        elif self.manager.undo() is not None:
+            self._show_current_image()
+
+    def redo(self):
+        tab_history = self.tab_histories.get(self.window.tabWidget.currentWidget())
+        if tab_history is not None:
+            tab_history.redo()
+        elif self.manager.redo() is not None:
+            self._show_current_image()
+
+    def _show_current_image(self):
+        image = self.manager.current_image
+        self.display_image(image, self.window.InputImage)
+        if image.ndim == 2:
+            self._show_gray_histograms(image)
+        else:
+            self._show_rgb_histograms(image)
 
     # ── Edge detection tab ────────────────────────────────────
 
@@ -157,8 +215,9 @@ class MainController(QObject):
         # Populate combo box with edge detection options
         self.window.edge_combo.addItems(["Sobel", "Prewitt", "Roberts", "Canny"])
 
-        # Connect apply button
+        # Connect apply button (full resolution); switching operators previews at display resolution
         self.window.edge_btn_apply.clicked.connect(self.apply_edge_detection)
+        self.window.edge_combo.currentIndexChanged.connect(self.preview_edge_detection)
 
     def apply_edge_detection(self):
         """Apply selected edge detection mask and show magnitude, gradient X and Y."""
@@ -166,25 +225,53 @@ class MainController(QObject):
             return
 
         selection = self.window.edge_combo.currentText()
-        gray = self.manager.gray_image
-        grad_x = grad_y = None
+        self.scheduler.submit("edges", self._compute_edges, self.manager.gray_image, selection,
+                              on_done=self._show_applied_edges, on_error=self._show_error)
+
+    def preview_edge_detection(self, *_):
+        """Edge detection on a display-sized proxy of the gray image (3x3 operators need no scaling)."""
+        if self.manager.original_image is None:
+            return
 
+        selection = self.window.edge_combo.currentText()
+        proxy, _ = proxy_for(self.manager.gray_image, self.window.edge_output_image)
+        self.scheduler.submit("edges", self._compute_edges, proxy, selection,
+                              on_done=self._show_edges, on_error=self._show_error)
+
+    @staticmethod
+    def _compute_edges(gray, selection):
+        """Worker-thread part of edge detection: returns display-ready uint8 images."""
+        # the gradient engine normalizes magnitude and both gradients itself (float32, one pass each)
         if selection == "Sobel":
-            edges, grad_x, grad_y = sobel_edge_detection(gray)
+            return sobel_edge_detection(gray, as_uint8=True)
         elif selection == "Prewitt":
-            edges, grad_x, grad_y = prewitt_edge_detection(gray)
+            return prewitt_edge_detection(gray, as_uint8=True)
         elif selection == "Roberts":
-            edges, grad_x, grad_y = roberts_edge_detection(gray)
+            return roberts_edge_detection(gray, as_uint8=True)
         elif selection == "Canny":
-            edges = canny_edge_detection(gray)
+            return normalize_image(canny_edge_detection(gray)), None, None
+        raise ValueError(f"Unknown edge detector: {selection!r}")
+
+    def _show_applied_edges(self, result):
+        # full-resolution results are undoable in this tab; previews are not
+        self.edge_history.push(np.stack([r for r in result if r is not None]), "edges")
+        self._show_edges(result)
+
+    def _restore_edges(self, stacked):
+        if stacked is None:
+            for label in (self.window.edge_output_image, self.window.edge_gradient_x_image,
+                          self.window.edge_gradient_y_image):
+                label.clear()
         else:
-            return
+            self._show_edges(tuple(stacked) if len(stacked) == 3 else (stacked[0], None, None))
 
-        self.display_gray_image(normalize_image(edges), self.window.edge_output_image)
+    def _show_edges(self, result):
+        edges, grad_x, grad_y = result
+        self.display_gray_image(edges, self.window.edge_output_image)
 
         if grad_x is not None and grad_y is not None:
-            self.display_gray_image(normalize_image(grad_x), self.window.edge_gradient_x_image)
-            self.display_gray_image(normalize_image(grad_y), self.window.edge_gradient_y_image)
+            self.display_gray_image(grad_x, self.window.edge_gradient_x_image)
+            self.display_gray_image(grad_y, self.window.edge_gradient_y_image)
         else:
             self.window.edge_gradient_x_image.clear()
             self.window.edge_gradient_y_image.clear()
@@ -201,10 +288,15 @@ class MainController(QObject):
         path, _ = QFileDialog.getOpenFileName(self.window, "Select Image", "", "Images (*.png *.jpg *.bmp *.jpeg)")
         if not path:
             return
-        img = cv2.imread(path)
-        if img is None:
-            return
-        self.equalization_image = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        # own channel: must not replace (or be replaced by) a pending main image load
+        self.scheduler.submit("load normalize", ImageManager.decode, path,
+                              on_done=self._on_normalize_equalize_loaded, on_error=self._show_error)
+
+    def _on_normalize_equalize_loaded(self, img):
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            img.setflags(write=False)       # shared with the memoized statistics
+        self.equalization_image = img
         self._refresh_normalize_equalize_input()
 
     def _refresh_normalize_equalize_input(self):
@@ -214,7 +306,7 @@ class MainController(QObject):
         # Display original
         self.display_gray_image(gray, self.window.normalize_input_image)
         hist = Histogram.computeHistoGray(gray)
-        self._set_canvas(self.window.normalize_input_histogram, [Histogram.plot_gray_histogram(hist)])
+        self._show_gray_histogram(self.window.normalize_input_histogram, hist)
         
         # Automatically apply normalization
         self.apply_normalization()
@@ -226,26 +318,38 @@ class MainController(QObject):
         gray = self.equalization_image if self.equalization_image is not None else self.manager.gray_image
         if gray is None:
             return
-        normalized = normalize_image(gray)
+        self.scheduler.submit("normalize", self._with_histogram, normalize_image, gray,
+                              on_done=self._show_normalization, on_error=self._show_error)
+
+    @staticmethod
+    def _with_histogram(func, gray):
+        """Worker-thread helper: run ``func`` on a gray image and histogram the result."""
+        result = func(gray)
+        return result, Histogram.computeHistoGray(result)
+
+    def _show_normalization(self, result):
+        normalized, hist = result
         self.display_gray_image(normalized, self.window.normalize_output_image)
-        hist = Histogram.computeHistoGray(normalized)
-        self._set_canvas(self.window.normalize_output_histogram, [Histogram.plot_gray_histogram(hist)])
+        self._show_gray_histogram(self.window.normalize_output_histogram, hist)
 
     def apply_equalization(self):
         gray = self.equalization_image if self.equalization_image is not None else self.manager.gray_image
         if gray is None:
             return
-        equalized = Histogram.equalize_gray(gray)
+        self.scheduler.submit("equalize", self._with_histogram, Histogram.equalize_gray, gray,
+                              on_done=self._show_equalization, on_error=self._show_error)
+
+    def _show_equalization(self, result):
+        equalized, hist_eq = result
         self.display_gray_image(equalized, self.window.equalization_output_image)
-        hist_eq = Histogram.computeHistoGray(equalized)
-        self._set_canvas(self.window.equalization_output_histogram, [Histogram.plot_gray_histogram(hist_eq)])
+        self._show_gray_histogram(self.window.equalization_output_histogram, hist_eq)
 
     def on_tab_changed(self, index):
         if index == 2 and self.manager.original_image is not None:
             self.display_image(self.manager.original_image, self.window.edge_input_image)
         elif index == 3:  # Normalization & Equalization tab
             if self.equalization_image is None and self.manager.original_image is not None:
-                self.equalization_image = self.manager.gray_image.copy()
+                self.equalization_image = self.manager.gray_image
             self._refresh_normalize_equalize_input()
         elif index == 1:
             if self.manager.original_image is not None:
@@ -1,11 +1,25 @@
 from controllers.main_controller import MainController
+from controllers.job_scheduler import JobScheduler
+from controllers.tab_history import TabHistory
+from core.noise import add_noise
+from core.filters import apply_filter
+from core.preview import proxy_for, scale_filter
+from core.pipeline import Pipeline
 
 
 class NoiseController:
-    def __init__(self, window, image_manager):
+    def __init__(self, window, image_manager, scheduler=None):
         self.ui = window
         self.image_manager = image_manager
         self.noisy_image = None
+        self._noisy_preview = None      # (proxy-resolution noisy image, scale)
+
+        # full-resolution input → noise → filter; unchanged stages come from the cache
+        self.pipeline = Pipeline().add("noise", "noise").add("filter", "filter")
+        self._pipeline_image = None
+        self.scheduler = scheduler or JobScheduler()
+        # applied (full-resolution) results, for undo/redo in this tab
+        self.history = TabHistory({"noise": self._restore_noisy, "filter": self._restore_filtered})
 
         self._setup_ui()
         self._connect_signals()
@@ -17,8 +31,9 @@ class NoiseController:
         )
 
         # Filters
+        # Average and Fast Gaussian cost the same at any size; the size box sets the window
         self.ui.noise_combo_filter.addItems(
-            ["Average (3x3)", "Gaussian (3x3)", "Median (3x3)"]
+            ["Average", "Gaussian", "Fast Gaussian", "Median"]
         )
 
     def _connect_signals(self):
@@ -26,35 +41,109 @@ class NoiseController:
         self.ui.noise_btn_apply.clicked.connect(self.apply_noise)
         self.ui.filter_btn_apply.clicked.connect(self.apply_filter)
 
-        # Auto-apply noise when slider changes
-        self.ui.noise_slider_amount.valueChanged.connect(self.apply_noise)
+        # Preview at display resolution while the slider / combos change;
+        # the Apply buttons recompute at full resolution
+        self.ui.noise_slider_amount.valueChanged.connect(self.preview_noise)
+        self.ui.noise_combo_type.currentIndexChanged.connect(self.preview_noise)
+        self.ui.noise_combo_filter.currentIndexChanged.connect(self.preview_filter)
+        self.ui.noise_spin_filter_size.valueChanged.connect(self.preview_filter)
 
-    def apply_noise(self):
+    def _filter_settings(self):
+        # even sizes typed into the box round up to the next odd one
+        return self.ui.noise_combo_filter.currentText(), self.ui.noise_spin_filter_size.value() | 1
+
+    def _noise_settings(self):
+        return self.ui.noise_combo_type.currentText(), self.ui.noise_slider_amount.value() / 100.0
+
+    def preview_noise(self, *_):
         image = self.image_manager.original_image
         if image is None:
             return
+        proxy, scale = proxy_for(image, self.ui.noise_noisy_image)
+        noise_type, amount = self._noise_settings()
+        self.scheduler.submit("noise", add_noise, proxy, noise_type, amount,
+                              on_done=lambda noisy: self._show_noise_preview(noisy, scale),
+                              on_error=self._show_error)
+
+    def _show_noise_preview(self, noisy, scale):
+        self._noisy_preview = (noisy, scale)
+        MainController.display_image(self, noisy, self.ui.noise_noisy_image)
+        self.preview_filter()
+
+    def _sync_pipeline(self) -> bool:
+        """Point the pipeline at the current image and settings; False when there is no image."""
+        image = self.image_manager.original_image
+        if image is None:
+            return False
+        if image is not self._pipeline_image:
+            self.pipeline.set_source(image)
+            self._pipeline_image = image
+            self.history.clear()            # results of the previous image
+        noise_type, amount = self._noise_settings()
+        self.pipeline.set_params("noise", noise_type=noise_type, amount=amount)
+        filter_type, size = self._filter_settings()
+        self.pipeline.set_params("filter", filter_type=filter_type, kernel_size=size)
+        return True
 
-        # Add noise
-        noise_type = self.ui.noise_combo_type.currentText()
-        amount = self.ui.noise_slider_amount.value() / 100.0
-
-        from core.noise import add_noise
-
-        self.noisy_image = add_noise(image, noise_type, amount)
+    def apply_noise(self):
+        # Add noise at full resolution (off the GUI thread); on its own channel so that
+        # preview ticks can't replace it, and pending previews would only overwrite it
+        if self._sync_pipeline():
+            self.scheduler.cancel("noise")
+            self.scheduler.submit("noise apply", self.pipeline.result, "noise",
+                                  on_done=self._show_noisy, on_error=self._show_error)
+
+    def _show_noisy(self, noisy_image):
+        self.noisy_image = noisy_image
+        self._noisy_preview = None
+        self.history.push(noisy_image, "noise")
 
         # Display noisy image, expand to fill its group box
         MainController.display_image(self, self.noisy_image, self.ui.noise_noisy_image)
 
-    def apply_filter(self):
-        image = self.noisy_image
-        if image is None:
-            return
-
-        filter_type = self.ui.noise_combo_filter.currentText()
-
-        from core.filters import apply_filter
+    def _show_error(self, message):
+        self.ui.statusbar.showMessage(message, 5000)
 
-        filtered_image = apply_filter(image, filter_type)
+    def preview_filter(self, *_):
+        if self._noisy_preview is not None:
+            noisy, scale = self._noisy_preview
+        elif self.noisy_image is not None:
+            noisy, scale = proxy_for(self.noisy_image, self.ui.noise_filtered_image)
+        else:
+            return
+        filter_type, size = self._filter_settings()
+        filter_type, size = scale_filter(filter_type, scale, size)
+        self.scheduler.submit("filter", apply_filter, noisy, filter_type, size,
+                              on_done=self._show_filtered, on_error=self._show_error)
 
+    def apply_filter(self):
+        # full-resolution noise is computed too if only a preview of it exists
+        if self._sync_pipeline():
+            self.scheduler.cancel("filter")
+            self.scheduler.submit("filter apply", self.pipeline.results, "noise", "filter",
+                                  on_done=self._show_noisy_and_filtered, on_error=self._show_error)
+
+    def _show_noisy_and_filtered(self, result):
+        noisy, filtered = result
+        if noisy is not self.noisy_image:
+            self._show_noisy(noisy)
+        self.history.push(filtered, "filter")
+        self._show_filtered(filtered)
+
+    def _restore_noisy(self, noisy_image):
+        self.noisy_image = noisy_image
+        self._noisy_preview = None
+        if noisy_image is None:
+            self.ui.noise_noisy_image.clear()
+        else:
+            MainController.display_image(self, noisy_image, self.ui.noise_noisy_image)
+
+    def _restore_filtered(self, filtered_image):
+        if filtered_image is None:
+            self.ui.noise_filtered_image.clear()
+        else:
+            self._show_filtered(filtered_image)
+
+    def _show_filtered(self, filtered_image):
         # Display filtered image, expand to fill its group box
         MainController.display_image(self, filtered_image, self.ui.noise_filtered_image)
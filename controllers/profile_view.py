@@ -0,0 +1,35 @@
+from PyQt5.QtWidgets import QLabel, QShortcut, QFileDialog
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import QObject, pyqtSignal
+from core import profiling
+
+
+class ProfileStatus(QObject):
+    """
+    Shows the stage breakdown of the last profiled operation in the status bar
+    and dumps the trace (Chrome trace-event JSON) on Ctrl+Shift+P. Only created
+    when profiling is enabled.
+    """
+
+    _finished = pyqtSignal(object)      # operations can finish on worker threads
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self._label = QLabel()
+        window.statusbar.addPermanentWidget(self._label)
+
+        self._finished.connect(self._show)
+        profiling.add_listener(self._finished.emit)
+
+        self._shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), window)
+        self._shortcut.activated.connect(self.save_trace)
+
+    def _show(self, operation):
+        self._label.setText(operation.summary())
+
+    def save_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self.window, "Save Profiling Trace", "trace.json", "JSON (*.json)")
+        if path:
+            profiling.dump_trace(path)
+            self.window.statusbar.showMessage(f"Trace written to {path}", 5000)
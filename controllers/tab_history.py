@@ -0,0 +1,46 @@
+import numpy as np
+from core.history import History
+
+# the state before anything was applied in the tab
+_EMPTY = np.zeros((0,), dtype=np.uint8)
+
+
+class TabHistory:
+    """
+    Undo/redo of the results applied in one tab, kept apart from the loaded
+    image's edit history (``ImageManager.history``), which they must not change.
+
+    ``views`` maps a state label to a callable that shows an image of that kind,
+    or clears its view when called with None. Stepping through the history shows,
+    for every label, its latest state at or before the cursor.
+    """
+
+    def __init__(self, views: dict, max_bytes: int = 128 << 20):
+        self.views = views
+        self.history = History(max_bytes=max_bytes)
+        self.clear()
+
+    def clear(self):
+        """Forget every state (e.g. when the tab's input changes)."""
+        self.history.reset(_EMPTY, "empty")
+
+    def push(self, image: np.ndarray, label: str):
+        self.history.push(image, label)
+
+    def undo(self) -> bool:
+        if self.history.undo() is None:
+            return False
+        self._show()
+        return True
+
+    def redo(self) -> bool:
+        if self.history.redo() is None:
+            return False
+        self._show()
+        return True
+
+    def _show(self):
+        labels = self.history.labels()[:self.history.cursor + 1]
+        for label, show in self.views.items():
+            index = max((i for i, name in enumerate(labels) if name == label), default=None)
+            show(None if index is None else self.history.state(index))
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+
+def _nbytes(value) -> int:
+    """Size of a cached value: arrays report ``nbytes``; tuples/lists are summed."""
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return int(getattr(value, "nbytes", 0))
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by total bytes (and optionally
+    by entry count). Values are usually numpy arrays; callers must treat cached
+    arrays as read-only, since the same object is handed to every hit.
+    """
+
+    def __init__(self, max_bytes: int, max_items: int = None):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._entries = OrderedDict()   # key → (value, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value            # larger than the whole budget: don't cache
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for ``key``, building and caching it with ``factory()`` on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, factory())
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self.current_bytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _evict(self):
+        while self._entries and (self.current_bytes > self.max_bytes or
+                                 (self.max_items is not None and len(self._entries) > self.max_items)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
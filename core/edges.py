@@ -1,96 +1,141 @@
 import numpy as np
 import cv2
 from core.image_manager import ImageManager
+from core import profiling
 
 
-def sobel_edge_detection(image: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    
-    # Convert to float for calculations
-    image = image.astype(np.float64)
-    
-    # Sobel kernels
-    # Kernel for detecting vertical edges (gradient in x direction)
-    sobel_x = np.array([
-        [-1, 0, 1],
-        [-2, 0, 2],
-        [-1, 0, 1]
-    ], dtype=np.float64)
-    
-    # Kernel for detecting horizontal edges (gradient in y direction)
-    sobel_y = np.array([
-        [-1, -2, -1],
-        [ 0,  0,  0],
-        [ 1,  2,  1]
-    ], dtype=np.float64)
-    
-    # Apply convolution with Sobel kernels
-    gradient_x = ImageManager.convolve(image, sobel_x)
-    gradient_y = ImageManager.convolve(image, sobel_y)
-    
-    # Calculate gradient magnitude
-    gradient_magnitude = np.sqrt(gradient_x**2 + gradient_y**2)
-    
-    return gradient_magnitude, gradient_x, gradient_y
+# Sobel kernels
+# Kernel for detecting vertical edges (gradient in x direction)
+SOBEL_X = np.array([
+    [-1, 0, 1],
+    [-2, 0, 2],
+    [-1, 0, 1]
+], dtype=np.float64)
 
+# Kernel for detecting horizontal edges (gradient in y direction)
+SOBEL_Y = np.array([
+    [-1, -2, -1],
+    [ 0,  0,  0],
+    [ 1,  2,  1]
+], dtype=np.float64)
 
+# Prewitt kernels (3x3)
+PREWITT_X = np.array([
+    [-1, 0, 1],
+    [-1, 0, 1],
+    [-1, 0, 1]
+], dtype=np.float64)
+
+PREWITT_Y = np.array([
+    [-1, -1, -1],
+    [ 0,  0,  0],
+    [ 1,  1,  1]
+], dtype=np.float64)
+
+# Roberts Cross kernels (2x2); not separable, run tap by tap (two taps each)
+ROBERTS_X = np.array([
+    [1,  0],
+    [0, -1]
+], dtype=np.float64)
+
+ROBERTS_Y = np.array([
+    [ 0, 1],
+    [-1, 0]
+], dtype=np.float64)
+
+
+def gradient_engine(image: np.ndarray, kernel_x: np.ndarray, kernel_y: np.ndarray,
+                    as_uint8: bool = False) -> tuple:
+    """
+    Fused gradient computation for a single-channel image.
+
+    The image is padded once (edge-replicated, same placement as
+    ``ImageManager.convolve``) and processed in row blocks: each block is cast to
+    float32 once and shared by both kernels (separable kernels run as two 1-D
+    passes), and the magnitude is computed from the block in place. Returns
+    float32 (magnitude, gx, gy), or with ``as_uint8`` the three images min-max
+    normalized to uint8 for display, as ``normalize_image`` would.
+    """
+    if image.ndim != 2:
+        raise ValueError(f"Gradient engine expects a single-channel image, got shape {image.shape}")
+    if kernel_x.shape != kernel_y.shape:
+        raise ValueError("Gradient kernels must have the same shape")
+
+    k_h, k_w = kernel_x.shape
+    passes = []
+    for kernel in (kernel_x, kernel_y):
+        separable = ImageManager.separate_kernel(kernel)
+        if separable is not None:
+            # flip for convolution
+            column, row = (v[::-1].astype(np.float32) for v in separable)
+            passes.append((ImageManager._correlate_separable, (column, row)))
+        else:
+            passes.append((ImageManager._correlate_direct, (np.flipud(np.fliplr(kernel)).astype(np.float32),)))
+
+    h, w = image.shape
+    with profiling.stage("pad"):
+        padded = np.pad(image, [((k_h - 1) // 2, k_h // 2), ((k_w - 1) // 2, k_w // 2)], mode='edge')
+
+    with profiling.stage("gradients"):
+        grad_x = np.empty((h, w), dtype=np.float32)
+        grad_y = np.empty((h, w), dtype=np.float32)
+        magnitude = np.empty((h, w), dtype=np.float32)
+        profiling.allocated(3 * magnitude.nbytes)
+        rows = ImageManager._block_rows(magnitude)
+        scratch = np.empty((rows, w), dtype=np.float32)
+        for r0 in range(0, h, rows):
+            r1 = min(r0 + rows, h)
+            block = padded[r0:r1 + k_h - 1].astype(np.float32)
+            gx, gy, mag, sc = grad_x[r0:r1], grad_y[r0:r1], magnitude[r0:r1], scratch[:r1 - r0]
+            for (correlate, kernel_args), out in zip(passes, (gx, gy)):
+                correlate(block, *kernel_args, out)
+            # magnitude = sqrt(gx² + gy²) without full-size temporaries
+            np.multiply(gx, gx, out=mag)
+            np.multiply(gy, gy, out=sc)
+            mag += sc
+            np.sqrt(mag, out=mag)
+
+    if not as_uint8:
+        return magnitude, grad_x, grad_y
+    with profiling.stage("normalize"):
+        return _normalize_to_uint8(magnitude), _normalize_to_uint8(grad_x), _normalize_to_uint8(grad_y)
+
+
+def _normalize_to_uint8(values: np.ndarray) -> np.ndarray:
+    """Min-max scale a float32 array to uint8 (truncating, like ``normalize_image``) in row blocks."""
+    min_val, max_val = float(values.min()), float(values.max())
+    out = np.zeros(values.shape, dtype=np.uint8)
+    if max_val == min_val:
+        return out
+    scale = np.float32(255 / (max_val - min_val))
+    rows = ImageManager._block_rows(values)
+    scratch = np.empty((rows,) + values.shape[1:], dtype=np.float32)
+    for r0 in range(0, values.shape[0], rows):
+        r1 = min(r0 + rows, values.shape[0])
+        sc = scratch[:r1 - r0]
+        np.subtract(values[r0:r1], np.float32(min_val), out=sc)
+        sc *= scale
+        np.clip(sc, 0, 255, out=sc)
+        out[r0:r1] = sc
+    return out
+
+
+def sobel_edge_detection(image: np.ndarray, as_uint8: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(magnitude, gradient x, gradient y) with the Sobel operator; float32 unless ``as_uint8``."""
+    return gradient_engine(image, SOBEL_X, SOBEL_Y, as_uint8)
+
+
+@profiling.profiled("canny")
 def canny_edge_detection(image: np.ndarray, low_threshold: int = 50, high_threshold: int = 150) -> np.ndarray:
-   
+
     return cv2.Canny(image, low_threshold, high_threshold)
 
 
-def prewitt_edge_detection(image: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-   
-    # Convert to float for calculations
-    image = image.astype(np.float64)
-    
-    # Prewitt kernels (3x3)
-    # Kernel for vertical edges (gradient in x direction)
-    prewitt_x = np.array([
-        [-1, 0, 1],
-        [-1, 0, 1],
-        [-1, 0, 1]
-    ], dtype=np.float64)
-    
-    # Kernel for horizontal edges (gradient in y direction)
-    prewitt_y = np.array([
-        [-1, -1, -1],
-        [ 0,  0,  0],
-        [ 1,  1,  1]
-    ], dtype=np.float64)
-    
-    # Apply convolution with Prewitt kernels
-    gradient_x = ImageManager.convolve(image, prewitt_x)
-    gradient_y = ImageManager.convolve(image, prewitt_y)
-    
-    # Calculate gradient magnitude
-    gradient_magnitude = np.sqrt(gradient_x**2 + gradient_y**2)
-    
-    
-    return gradient_magnitude, gradient_x, gradient_y
-
-
-def roberts_edge_detection(image: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    
-    # Convert to float for calculations
-    image = image.astype(np.float64)
-    
-    # Roberts Cross kernels (2x2)
-    # These are applied differently - we handle the 2x2 case manually
-    roberts_x = np.array([
-        [1,  0],
-        [0, -1]
-    ], dtype=np.float64)
-    
-    roberts_y = np.array([
-        [ 0, 1],
-        [-1, 0]
-    ], dtype=np.float64)
-    
-    # Apply convolution with Roberts kernels
-    gradient_x = ImageManager.convolve(image, roberts_x)
-    gradient_y = ImageManager.convolve(image, roberts_y)
-    
-    # Calculate gradient magnitude
-    gradient_magnitude = np.sqrt(gradient_x**2 + gradient_y**2)
-    
-    return gradient_magnitude, gradient_x, gradient_y
+def prewitt_edge_detection(image: np.ndarray, as_uint8: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(magnitude, gradient x, gradient y) with the Prewitt operator; float32 unless ``as_uint8``."""
+    return gradient_engine(image, PREWITT_X, PREWITT_Y, as_uint8)
+
+
+def roberts_edge_detection(image: np.ndarray, as_uint8: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(magnitude, gradient x, gradient y) with the Roberts Cross operator; float32 unless ``as_uint8``."""
+    return gradient_engine(image, ROBERTS_X, ROBERTS_Y, as_uint8)
@@ -1,38 +1,128 @@
+import re
 import numpy as np
+import cv2
+from math import comb
 from core.image_manager import ImageManager
+from core.median import median_filter as _median_filter
 
 
-def apply_filter(image, filter_type):
-    if filter_type == "Average (3x3)":
-        return average_filter(image)
+def _parse_kernel_size(filter_type, kernel_size):
+    """Explicit size wins; otherwise read it from labels like "Gaussian (7x7)"; default 3."""
+    if kernel_size is None:
+        match = re.search(r"\((\d+)x\d+\)", filter_type)
+        kernel_size = int(match.group(1)) if match else 3
+    if kernel_size < 1 or kernel_size % 2 == 0:
+        raise ValueError(f"Kernel size must be a positive odd number, got {kernel_size}")
+    return kernel_size
 
-    elif filter_type == "Gaussian (3x3)":
-        return gaussian_filter(image)
 
-    elif filter_type == "Median (3x3)":
-        return median_filter(image)
+def apply_filter(image, filter_type, kernel_size=None):
+    name = filter_type.split(" (")[0]
+    size = _parse_kernel_size(filter_type, kernel_size)
+
+    if name == "Average":
+        return average_filter(image, size)
+
+    elif name == "Gaussian":
+        return gaussian_filter(image, size)
+
+    elif name == "Fast Gaussian":
+        return fast_gaussian_filter(image, size)
+
+    elif name == "Median":
+        return median_filter(image, size)
 
     return image
 
 
-def average_filter(image):
-    kernel = np.ones((3, 3)) / 9
-    return ImageManager.convolve(image, kernel)
+def average_kernel(size=3):
+    return np.ones((size, size)) / size ** 2
+
+
+def gaussian_kernel(size=3):
+    # binomial coefficients: 3 → [1, 2, 1], 5 → [1, 4, 6, 4, 1], ... (sigma ≈ sqrt(size - 1) / 2)
+    row = np.array([comb(size - 1, i) for i in range(size)], dtype=np.float64)
+    return np.outer(row, row) / row.sum() ** 2
+
+
+def filter_radius(filter_type, kernel_size=None):
+    """Pixels of context a filter reads on each side of the output pixel."""
+    size = _parse_kernel_size(filter_type, kernel_size)
+    if filter_type.split(" (")[0] == "Fast Gaussian":
+        return sum(width // 2 for width in _box_widths(gaussian_sigma(size)))
+    return size // 2
+
+
+def _box_sum(values, width):
+    """
+    Sums over every ``width`` x ``width`` window (edge-replicated), as running sums:
+    constant cost per pixel. Exact for integer-valued float64 input.
+    """
+    return cv2.boxFilter(values, cv2.CV_64F, (width, width), normalize=False,
+                         borderType=cv2.BORDER_REPLICATE)
+
+
+def box_filter(image, size=3, passes=1):
+    """
+    Mean over a ``size`` x ``size`` window (edge-replicated borders), with constant
+    cost per pixel. ``passes`` repeats it on the result. Like convolving with
+    ``average_kernel``: raw float64 for gray; colour is clipped and truncated to uint8.
+    """
+    return _box_passes(image, [size] * passes)
+
+
+def _box_passes(image, widths):
+    # integer images stay integer-valued (sums, not means) until one division at the
+    # end, so every sum is exact and tiles give exactly the whole-image result
+    result = np.ascontiguousarray(image, dtype=np.float64)
+    for width in widths:
+        result = _box_sum(result, width)
+    result /= float(np.prod([width * width for width in widths]))
+    if image.ndim == 2:
+        return result
+    # the same conversion as the convolution filters
+    return ImageManager.clip_to_uint8(result)
+
+
+def gaussian_sigma(size):
+    """Sigma of ``gaussian_kernel(size)``: the binomial of ``size - 1`` trials has variance (size - 1) / 4."""
+    return np.sqrt(size - 1) / 2
+
+
+def _box_widths(sigma, passes=3):
+    """
+    Odd box widths whose ``passes``-fold convolution best matches a Gaussian of
+    ``sigma`` (W. Wells, "Efficient synthesis of Gaussian filters by cascaded
+    uniform filters", 1986): the widths differ by at most 2.
+    """
+    ideal = np.sqrt(12 * sigma ** 2 / passes + 1)
+    lower = int(ideal)
+    lower -= 1 if lower % 2 == 0 else 0
+    lower = max(lower, 1)
+    upper = lower + 2
+    count = round((12 * sigma ** 2 - passes * lower ** 2 - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    count = min(max(count, 0), passes)
+    return [lower] * count + [upper] * (passes - count)
+
+
+def fast_gaussian_filter(image, size=3):
+    """
+    Gaussian blur approximated by three box passes (central limit theorem),
+    each a running-sum box filter, so the cost does not grow with ``size``.
+    Sigma matches ``gaussian_filter`` of the same size (``gaussian_sigma``), so the
+    two blur alike. Output like ``gaussian_filter``.
+    """
+    return _box_passes(image, _box_widths(gaussian_sigma(size)))
+
+
+def average_filter(image, size=3):
+    # convolving with average_kernel(size) up to float rounding, in constant time per pixel
+    return box_filter(image, size)
 
 
-def gaussian_filter(image):
-    kernel = np.array([
-        [1, 2, 1],
-        [2, 4, 2],
-        [1, 2, 1]
-    ]) / 16
-    return ImageManager.convolve(image, kernel)
+def gaussian_filter(image, size=3):
+    return ImageManager.convolve(image, gaussian_kernel(size))
 
 
-def median_filter(image):
-    from numpy.lib.stride_tricks import sliding_window_view
-    padded = np.pad(image, ((1, 1), (1, 1), (0, 0)), mode='edge')
-    # windows shape: (H, W, C, 3, 3)
-    windows = sliding_window_view(padded, (3, 3), axis=(0, 1))
-    # median over the two kernel axes → shape (H, W, C)
-    return np.median(windows, axis=(-2, -1)).astype(np.uint8)
\ No newline at end of file
+def median_filter(image, size=3):
+    return _median_filter(image, size)
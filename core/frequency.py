@@ -1,5 +1,15 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import cv2
+from core.cache import LRUCache
+from core import profiling
+
+# frequency masks are rebuilt for every call otherwise; 256 MB holds ~32 float32 12-MP half-spectrum masks
+_MASK_CACHE = LRUCache(max_bytes=256 << 20)
+# worker threads for per-channel FFTs, created on first use
+_EXECUTOR = None
+
 
 def _to_gray_float(image: np.ndarray) -> np.ndarray:
     """Convert image to grayscale float32 in [0,1]."""
@@ -12,49 +22,102 @@ def _to_gray_float(image: np.ndarray) -> np.ndarray:
     return gray.astype(np.float32) / 255.0
 
 
+def dft_shape(shape: tuple) -> tuple:
+    """
+    Fast transform size for an image of ``shape``: each side rounded up to a
+    product of 2, 3 and 5 (``cv2.getOptimalDFTSize``), the width also even so the
+    rfft2 half-spectrum determines it. Sizes with large prime factors otherwise
+    make the FFT many times slower.
+    """
+    rows, cols = shape[:2]
+    cols = cv2.getOptimalDFTSize(cols)
+    while cols % 2:
+        cols = cv2.getOptimalDFTSize(cols + 1)
+    return cv2.getOptimalDFTSize(rows), cols
+
+
+def _pad_offsets(shape: tuple, padded: tuple) -> tuple:
+    """(top, left) of the image inside its padded transform: padding is split between both sides."""
+    return (padded[0] - shape[0]) // 2, (padded[1] - shape[1]) // 2
+
+
+def _pad_plane(plane: np.ndarray, padded: tuple) -> np.ndarray:
+    """
+    Reflect-pad a 2-D plane to ``padded``. Mirrored borders continue the image
+    smoothly, so the transform sees no extra edge and wrap-around stays small.
+    """
+    h, w = plane.shape
+    if (h, w) == tuple(padded):
+        return plane
+    top, left = _pad_offsets((h, w), padded)
+    with profiling.stage("pad"):
+        return cv2.copyMakeBorder(plane, top, padded[0] - h - top, left, padded[1] - w - left,
+                                  cv2.BORDER_REFLECT_101)
+
+
 def _fft(image_float: np.ndarray):
-    """Return shifted DFT of a float image."""
-    f = np.fft.fft2(image_float)
+    """Return shifted DFT of a float image, reflect-padded to a fast transform size."""
+    f = np.fft.fft2(_pad_plane(image_float, dft_shape(image_float.shape)))
     return np.fft.fftshift(f)
 
 
-def _ifft(f_shifted: np.ndarray) -> np.ndarray:
-    """Return spatial image from shifted DFT, clipped to [0,255] uint8."""
-    f = np.fft.ifftshift(f_shifted)
-    result = np.fft.ifft2(f)
-    result = np.abs(result)
-    result = np.clip(result * 255.0, 0, 255).astype(np.uint8)
-    return result
+def fft_convolve(padded: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Linear convolution of an already-padded array with a 2-D kernel via the real FFT.
 
+    The spatial axes are 0 and 1; a trailing channel axis is transformed in the same
+    call. Only the 'valid' region (unaffected by circular wrap-around) is returned,
+    so the output is ``padded.shape[:2] - kernel.shape + 1`` in each spatial axis.
+    """
+    p_h, p_w = padded.shape[:2]
+    k_h, k_w = kernel.shape
+    # any transform size >= padded size keeps the valid region wrap-free
+    size = (cv2.getOptimalDFTSize(p_h), cv2.getOptimalDFTSize(p_w))
 
-def _ideal_circle_mask(shape: tuple, cutoff: int, low_pass: bool) -> np.ndarray:
-    """Create an ideal circular low-pass or high-pass mask."""
+    f_image = np.fft.rfft2(padded, s=size, axes=(0, 1))
+    f_kernel = np.fft.rfft2(kernel, s=size)
+    if padded.ndim == 3:
+        f_kernel = f_kernel[:, :, None]
+    result = np.fft.irfft2(f_image * f_kernel, s=size, axes=(0, 1))
+    return result[k_h - 1:p_h, k_w - 1:p_w]
+
+
+def _half_spectrum_dist_sq(shape: tuple) -> np.ndarray:
+    """
+    Squared distance from the zero frequency for every bin of the unshifted
+    ``rfft2`` half-spectrum of an image of ``shape``, transformed at
+    ``dft_shape(shape)`` (rows, cols // 2 + 1 of that size).
+    Equivalent to measuring from the centre of the fftshift-ed full spectrum,
+    without materialising any shifted copies. Distances are in the image's own
+    frequency units (bins of an unpadded transform), so a cutoff means the same
+    whatever padding the transform needed.
+    """
     rows, cols = shape
-    crow, ccol = rows // 2, cols // 2
-    y, x = np.ogrid[:rows, :cols]
-    dist = np.sqrt((x - ccol) ** 2 + (y - crow) ** 2)
+    p_rows, p_cols = dft_shape(shape)
+    u = (np.fft.fftfreq(p_rows) * rows).astype(np.float32)[:, None]
+    v = (np.fft.rfftfreq(p_cols) * cols).astype(np.float32)[None, :]
+    return u ** 2 + v ** 2
+
+
+def _ideal_circle_mask(shape: tuple, cutoff: int, low_pass: bool) -> np.ndarray:
+    """Create an ideal circular low-pass or high-pass half-spectrum mask."""
+    dist = np.sqrt(_half_spectrum_dist_sq(shape))
     mask = (dist <= cutoff).astype(np.float32)
     return mask if low_pass else 1.0 - mask
 
 
 def _gaussian_mask(shape: tuple, cutoff: int, low_pass: bool) -> np.ndarray:
-    """Create a Gaussian low-pass or high-pass mask."""
-    rows, cols = shape
-    crow, ccol = rows // 2, cols // 2
-    y, x = np.ogrid[:rows, :cols]
-    dist_sq = (x - ccol) ** 2 + (y - crow) ** 2
-    mask = np.exp(-dist_sq / (2 * cutoff ** 2)).astype(np.float32)
+    """Create a Gaussian low-pass or high-pass half-spectrum mask."""
+    dist_sq = _half_spectrum_dist_sq(shape)
+    mask = np.exp(-dist_sq / np.float32(2 * cutoff ** 2)).astype(np.float32)
     return mask if low_pass else 1.0 - mask
 
 
 def _butterworth_mask(shape: tuple, cutoff: int, order: int, low_pass: bool) -> np.ndarray:
-    """Create a Butterworth low-pass or high-pass mask."""
-    rows, cols = shape
-    crow, ccol = rows // 2, cols // 2
-    y, x = np.ogrid[:rows, :cols]
-    dist = np.sqrt((x - ccol) ** 2 + (y - crow) ** 2)
-    # Avoid division by zero
-    dist[crow, ccol] = 1e-6
+    """Create a Butterworth low-pass or high-pass half-spectrum mask."""
+    dist = np.sqrt(_half_spectrum_dist_sq(shape))
+    # Avoid division by zero (the DC bin is at [0, 0] in the unshifted layout)
+    dist[0, 0] = 1e-6
     if low_pass:
         mask = 1.0 / (1.0 + (dist / cutoff) ** (2 * order))
     else:
@@ -62,6 +125,165 @@ def _butterworth_mask(shape: tuple, cutoff: int, order: int, low_pass: bool) ->
     return mask.astype(np.float32)
 
 
+def get_mask(shape: tuple, filter_type: str, cutoff: int, low_pass: bool, order: int = 2) -> np.ndarray:
+    """
+    Return the (read-only) half-spectrum mask for an image of ``shape``, sized for its
+    padded transform (``dft_shape``), built once and then served from a shared LRU
+    cache keyed by (shape, type, cutoff, order, pass).
+    """
+    if filter_type not in ("ideal", "gaussian", "butterworth"):
+        raise ValueError(f"Unknown filter_type: {filter_type!r}")
+    # order only affects Butterworth masks; don't let it split the cache for the others
+    key = (tuple(shape), filter_type, cutoff, order if filter_type == "butterworth" else None, low_pass)
+
+    @profiling.profiled("mask")
+    def build():
+        if filter_type == "ideal":
+            mask = _ideal_circle_mask(shape, cutoff, low_pass)
+        elif filter_type == "gaussian":
+            mask = _gaussian_mask(shape, cutoff, low_pass)
+        else:
+            mask = _butterworth_mask(shape, cutoff, order, low_pass)
+        mask.setflags(write=False)     # shared between callers
+        return mask
+
+    return _MASK_CACHE.get_or_create(key, build)
+
+
+def mask_cache_stats() -> dict:
+    """Hit/miss/eviction counters and memory use of the frequency-mask cache."""
+    return _MASK_CACHE.stats()
+
+
+def clear_mask_cache():
+    _MASK_CACHE.clear()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="fft")
+    return _EXECUTOR
+
+
+def _full_log_magnitude(half: np.ndarray, cols: int) -> np.ndarray:
+    """
+    Expand the log-magnitude of an rfft2 half-spectrum to the full, fftshift-ed
+    spectrum using Hermitian symmetry |F[u, v]| = |F[-u, -v]|.
+    """
+    rows, half_cols = half.shape
+    full = np.empty((rows, cols), dtype=half.dtype)
+    full[:, :half_cols] = half
+    neg_rows = (-np.arange(rows)) % rows
+    full[:, half_cols:] = half[neg_rows][:, cols - np.arange(half_cols, cols)]
+    return np.fft.fftshift(full)
+
+
+def _rfft_channel(image: np.ndarray, c: int) -> np.ndarray:
+    """Single-precision rfft2 of channel ``c`` of a uint8 gray or colour image, at ``dft_shape``."""
+    plane = (image[:, :, c] if image.ndim == 3 else image).astype(np.float32)
+    plane = _pad_plane(plane, dft_shape(image.shape))
+    with profiling.stage("fft"):
+        return np.fft.rfft2(plane)
+
+
+def _irfft_into(spectrum: np.ndarray, shape: tuple, out: np.ndarray, c: int):
+    """
+    Inverse rfft2 of a (masked) padded half-spectrum, cropped back to the image
+    ``shape`` and written as uint8 into channel ``c`` of ``out``.
+    """
+    padded = dft_shape(shape)
+    with profiling.stage("ifft"):
+        result = np.fft.irfft2(spectrum, s=padded)
+    if padded != tuple(shape):
+        top, left = _pad_offsets(shape, padded)
+        result = result[top:top + shape[0], left:left + shape[1]]
+    np.abs(result, out=result)
+    np.clip(result, 0, 255, out=result)
+    if out.ndim == 3:
+        out[:, :, c] = result
+    else:
+        out[...] = result
+
+
+def _filter_channel(image: np.ndarray, c: int, mask: np.ndarray, out: np.ndarray, with_spectrum: bool):
+    """
+    Forward rfft2, optional log-magnitude spectrum, in-place mask and inverse rfft2
+    for channel ``c``, all in single precision; the uint8 result is written into ``out``.
+    Working on the raw 0-255 values is equivalent to the old [0, 1] round trip
+    (the transform is linear) and saves two full-image passes.
+    """
+    shape = image.shape[:2]
+    spectrum = _rfft_channel(image, c)
+
+    magnitude = None
+    if with_spectrum:
+        with profiling.stage("spectrum"):
+            # same scale as transforming the [0, 1] image, as the display always has
+            magnitude = np.log1p(np.abs(spectrum) * np.float32(1 / 255))
+            magnitude = _full_log_magnitude(magnitude, dft_shape(shape)[1])
+            magnitude = cv2.normalize(magnitude, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+            magnitude = _to_image_size(magnitude, shape)
+
+    spectrum *= mask
+    _irfft_into(spectrum, shape, out, c)
+    return magnitude
+
+
+def _to_image_size(spectrum: np.ndarray, shape: tuple) -> np.ndarray:
+    """Resample a spectrum display computed at the padded transform size to the image size."""
+    if spectrum.shape[:2] == tuple(shape):
+        return spectrum
+    return cv2.resize(spectrum, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+
+
+def _map_channels(func, channels: int) -> list:
+    """Run ``func(c)`` for every channel, on worker threads when there is more than one core."""
+    workers = min(channels, os.cpu_count() or 1)
+    if workers == 1:
+        return [func(c) for c in range(channels)]
+    return list(_executor().map(profiling.propagate(func), range(channels)))
+
+
+def _filter_channels(image: np.ndarray, mask: np.ndarray, with_spectrum: bool) -> tuple:
+    """
+    Filter every channel of a uint8 image with one half-spectrum mask. Channels are
+    spread over worker threads (numpy's FFT releases the GIL) and processed one
+    plane at a time per worker, so peak memory stays at a few single-channel buffers.
+    Returns the uint8 filtered image and the list of per-channel spectra (or Nones).
+    """
+    out = np.empty(image.shape, dtype=np.uint8)
+    channels = image.shape[2] if image.ndim == 3 else 1
+    spectra = _map_channels(lambda c: _filter_channel(image, c, mask, out, with_spectrum), channels)
+    return out, spectra
+
+
+def filter_with_mask(image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Filter a uint8 gray or colour image with a half-spectrum mask from ``get_mask``."""
+    return _filter_channels(image, mask, with_spectrum=False)[0]
+
+
+def forward_spectra(image: np.ndarray) -> np.ndarray:
+    """
+    Half-spectra of every channel of a uint8 image, reflect-padded to
+    ``dft_shape`` (H', W'), as a (C, H', W' // 2 + 1) complex64 array. Keep it to re-filter the same image with different masks
+    via ``inverse_filtered`` without repeating the forward transforms.
+    """
+    channels = image.shape[2] if image.ndim == 3 else 1
+    return np.stack(_map_channels(lambda c: _rfft_channel(image, c), channels))
+
+
+def inverse_filtered(spectra: np.ndarray, mask: np.ndarray, shape: tuple) -> np.ndarray:
+    """
+    Mask and invert spectra from ``forward_spectra`` (left untouched) back to a
+    uint8 image of spatial ``shape`` (the padding is cropped off); three or more channels give a colour image.
+    """
+    channels = len(spectra)
+    out = np.empty(tuple(shape) + ((channels,) if channels > 1 else ()), dtype=np.uint8)
+    _map_channels(lambda c: _irfft_into(spectra[c] * mask, shape, out, c), channels)
+    return out
+
+
 def apply_frequency_filter(
     image: np.ndarray,
     filter_type: str = "ideal",   # "ideal" | "gaussian" | "butterworth"
@@ -72,6 +294,12 @@ def apply_frequency_filter(
     """
     Apply a frequency-domain filter to a grayscale or colour image.
 
+    Channels are reflect-padded to a fast transform size (``dft_shape``), go
+    through single-precision real FFTs (rfft2) spread over worker threads, and
+    are cropped back after the inverse; the mask is applied to the unshifted
+    half-spectrum in place. Time therefore depends on the image area, not on
+    how its sides factorize.
+
     Parameters
     ----------
     image      : Input BGR or grayscale image (uint8).
@@ -88,48 +316,16 @@ def apply_frequency_filter(
     is_color = len(image.shape) == 3
     low_pass = pass_type == "low"
 
-    # ---- build channels to process ----
-    if is_color:
-        channels = cv2.split(image)
-    else:
-        channels = [image]
-
-    shape = channels[0].shape
-
-    # ---- build mask ----
-    if filter_type == "ideal":
-        mask = _ideal_circle_mask(shape, cutoff, low_pass)
-    elif filter_type == "gaussian":
-        mask = _gaussian_mask(shape, cutoff, low_pass)
-    elif filter_type == "butterworth":
-        mask = _butterworth_mask(shape, cutoff, order, low_pass)
-    else:
-        raise ValueError(f"Unknown filter_type: {filter_type!r}")
-
-    # ---- process each channel ----
-    filtered_channels = []
-    magnitude_spectra = []
-
-    for ch in channels:
-        ch_float = ch.astype(np.float32) / 255.0
-        f_shift = _fft(ch_float)
-
-        # magnitude spectrum for visualisation (use first channel only)
-        mag = np.log1p(np.abs(f_shift))
-        mag = cv2.normalize(mag, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-        magnitude_spectra.append(mag)
+    # ---- build (or reuse) mask ----
+    mask = get_mask(image.shape[:2], filter_type, cutoff, low_pass, order)
 
-        # apply mask
-        f_filtered = f_shift * mask
-        result_ch = _ifft(f_filtered)
-        filtered_channels.append(result_ch)
+    # ---- process all channels ----
+    filtered_image, magnitude_spectra = _filter_channels(image, mask, with_spectrum=True)
 
     # ---- merge / return ----
     if is_color:
-        filtered_image = cv2.merge(filtered_channels)
         magnitude_spectrum = cv2.merge(magnitude_spectra)
     else:
-        filtered_image = filtered_channels[0]
         magnitude_spectrum = magnitude_spectra[0]
 
     return filtered_image, magnitude_spectrum
@@ -144,4 +340,4 @@ def get_magnitude_spectrum(image: np.ndarray) -> np.ndarray:
     f_shift = _fft(gray_float)
     mag = np.log1p(np.abs(f_shift))
     mag = cv2.normalize(mag, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-    return mag
\ No newline at end of file
+    return _to_image_size(mag, gray_float.shape)
\ No newline at end of file
@@ -1,36 +1,37 @@
-import cv2
 from matplotlib.figure import Figure
+from core.statistics import image_stats
 
 class Histogram:
 
+    # Histograms come from the shared statistics service, so asking again for
+    # the same image array (another tab, a refresh) does not rescan its pixels.
+
     @staticmethod
     def computeHistoColored(image):
-        histB = cv2.calcHist([image], [0], None, [256], [0, 256]).flatten()
-        histG = cv2.calcHist([image], [1], None, [256], [0, 256]).flatten()
-        histR = cv2.calcHist([image], [2], None, [256], [0, 256]).flatten()
+        histB, histG, histR = image_stats(image).hists
         return histB, histG, histR
 
     @staticmethod
     def computeHistoGray(gray_image):
-        return cv2.calcHist([gray_image], [0], None, [256], [0, 256]).flatten()
+        return image_stats(gray_image).hists[0]
 
     @staticmethod
     def compute_cdf_colored(histB, histG, histR):
-        normalize = lambda h: h.cumsum() / h.cumsum().max()
-        return normalize(histB), normalize(histG), normalize(histR)
+        return Histogram.compute_cdf_gray(histB), Histogram.compute_cdf_gray(histG), Histogram.compute_cdf_gray(histR)
 
     @staticmethod
     def compute_cdf_gray(hist):
         cdf = hist.cumsum()
-        return cdf / cdf.max()
+        return cdf / cdf[-1]
 
     @staticmethod
     def plot_colored_histogram(histB, histG, histR, show_blue=True, show_green=True, show_red=True):
         fig = Figure(figsize=(5, 4))
         ax = fig.add_subplot(111)
-        if show_blue:  ax.bar(range(256), histB, color='blue',  alpha=0.3, label='Blue')
-        if show_green: ax.bar(range(256), histG, color='green', alpha=0.3, label='Green')
-        if show_red:   ax.bar(range(256), histR, color='red',   alpha=0.3, label='Red')
+        # one filled step patch per channel instead of 256 bar patches
+        if show_blue:  ax.stairs(histB, range(257), fill=True, color='blue',  alpha=0.3, label='Blue')
+        if show_green: ax.stairs(histG, range(257), fill=True, color='green', alpha=0.3, label='Green')
+        if show_red:   ax.stairs(histR, range(257), fill=True, color='red',   alpha=0.3, label='Red')
         ax.set(xlabel='Pixel Intensity', ylabel='Frequency', title='RGB Histogram')
         ax.legend(); ax.grid(True)
         return fig
@@ -39,7 +40,7 @@ class Histogram:
     def plot_gray_histogram(hist):
         fig = Figure(figsize=(5, 4))
         ax = fig.add_subplot(111)
-        ax.bar(range(256), hist, color='black')
+        ax.stairs(hist, range(257), fill=True, color='black')
         ax.set(xlabel='Pixel Intensity', ylabel='Frequency', title='Grayscale Histogram')
         ax.grid(True)
         return fig
@@ -66,8 +67,7 @@ class Histogram:
 
     @staticmethod
     def equalize_gray(gray_image):
-        """Self-contained: computes hist and cdf internally."""
-        hist = Histogram.computeHistoGray(gray_image)
-        cdf = hist.cumsum()
-        lookup_table = ((cdf / hist.sum()) * 255).astype('uint8')
+        """Self-contained: takes the (memoized) cdf from the statistics service."""
+        cdf = image_stats(gray_image).cdfs[0]
+        lookup_table = (cdf * 255).astype('uint8')
         return lookup_table[gray_image]
\ No newline at end of file
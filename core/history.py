@@ -0,0 +1,211 @@
+import threading
+import zlib
+import numpy as np
+
+# a delta is only worth keeping if it compresses to this fraction of the image
+_DELTA_MAX_RATIO = 0.5
+
+
+class _Entry:
+    __slots__ = ("label", "image", "recipe", "delta", "shape", "dtype")
+
+    def __init__(self, label, image, recipe):
+        self.label = label
+        self.image = image          # full array, or None once compacted
+        self.recipe = recipe        # callable(previous image) -> this image, or None
+        self.delta = None           # zlib-compressed (this - previous) in the image dtype, or None
+        self.shape = image.shape
+        self.dtype = image.dtype
+
+
+class History:
+    """
+    Undo/redo stack of image states under a memory budget.
+
+    States are stored compactly:
+
+    * copy-on-write references: arrays are never modified in place, so a state
+      that reuses an existing array (e.g. a reset to the original) costs nothing;
+    * recipes: a state produced by a deterministic function of the previous one
+      can drop its pixels and be recomputed;
+    * compressed deltas: otherwise the difference to the previous state is
+      zlib-compressed when that is at most half the raw size.
+
+    Full arrays are kept for the states nearest the cursor, so stepping back and
+    forth is instant; when the budget is exceeded, the farthest states are
+    compacted first and, if that is not enough, the oldest states are dropped.
+    The first state is always kept in full.
+    """
+
+    def __init__(self, max_bytes: int = 512 << 20, max_states: int = 100):
+        self.max_bytes = max_bytes
+        self.max_states = max_states
+        self._entries = []
+        self._cursor = -1
+        self._lock = threading.Lock()
+
+    # ---- stack operations ----
+
+    def reset(self, image: np.ndarray, label: str = "open"):
+        """Start a new history whose first state is ``image`` (kept by reference)."""
+        with self._lock:
+            self._entries = [_Entry(label, image, None)]
+            self._cursor = 0
+
+    def push(self, image: np.ndarray, label: str = "edit", recipe=None) -> np.ndarray:
+        """
+        Add ``image`` as the new current state, discarding any redo states.
+        ``recipe(previous_image)`` must reproduce ``image`` exactly if given.
+        """
+        with self._lock:
+            if not self._entries:
+                self._entries = [_Entry(label, image, None)]
+                self._cursor = 0
+                return image
+            del self._entries[self._cursor + 1:]
+            self._entries.append(_Entry(label, image, recipe))
+            self._cursor = len(self._entries) - 1
+            while len(self._entries) > max(self.max_states, 2):
+                self._drop_oldest()
+            self._enforce_budget()
+            return image
+
+    def undo(self):
+        """Step back; returns the now-current image, or None at the first state."""
+        with self._lock:
+            if self._cursor <= 0:
+                return None
+            self._cursor -= 1
+            return self._current()
+
+    def redo(self):
+        """Step forward; returns the now-current image, or None at the last state."""
+        with self._lock:
+            if self._cursor < 0 or self._cursor >= len(self._entries) - 1:
+                return None
+            self._cursor += 1
+            return self._current()
+
+    def state(self, index: int) -> np.ndarray:
+        """Image of state ``index`` (rebuilt if compacted); the cursor does not move."""
+        with self._lock:
+            return self._materialize(index)
+
+    def current(self):
+        with self._lock:
+            return self._current() if self._cursor >= 0 else None
+
+    @property
+    def can_undo(self) -> bool:
+        return self._cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return 0 <= self._cursor < len(self._entries) - 1
+
+    def labels(self) -> list:
+        return [e.label for e in self._entries]
+
+    @property
+    def cursor(self) -> int:
+        return self._cursor
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---- memory ----
+
+    def nbytes(self) -> int:
+        """Bytes held: distinct full arrays plus compressed deltas."""
+        seen, total = set(), 0
+        for e in self._entries:
+            if e.image is not None and id(e.image) not in seen:
+                seen.add(id(e.image))
+                total += e.image.nbytes
+            if e.delta is not None:
+                total += len(e.delta)
+        return total
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "states": len(self._entries),
+                "cursor": self._cursor,
+                "bytes": self.nbytes(),
+                "max_bytes": self.max_bytes,
+                "full": sum(e.image is not None for e in self._entries),
+                "deltas": sum(e.delta is not None for e in self._entries),
+                "recipes": sum(e.image is None and e.recipe is not None for e in self._entries),
+            }
+
+    # ---- internals (lock held) ----
+
+    def _current(self) -> np.ndarray:
+        image = self._materialize(self._cursor)
+        # keep the current state in full for instant redisplay; compact others if that overflows
+        self._entries[self._cursor].image = image
+        self._enforce_budget()
+        return image
+
+    def _materialize(self, index: int) -> np.ndarray:
+        # walk back to the nearest full state, then replay recipes / deltas forward
+        start = index
+        while self._entries[start].image is None:
+            start -= 1
+        image = self._entries[start].image
+        for i in range(start + 1, index + 1):
+            image = self._rebuild(self._entries[i], image)
+        return image
+
+    @staticmethod
+    def _rebuild(entry: _Entry, previous: np.ndarray) -> np.ndarray:
+        if entry.image is not None:
+            return entry.image
+        if entry.recipe is not None:
+            return entry.recipe(previous)
+        diff = np.frombuffer(zlib.decompress(entry.delta), dtype=entry.dtype).reshape(entry.shape)
+        return previous + diff          # modular arithmetic for integer images
+
+    def _compact(self, index: int) -> bool:
+        """Drop the full array of state ``index`` if it can be rebuilt; True on success."""
+        entry = self._entries[index]
+        if index == 0 or entry.image is None:
+            return False
+        if any(e.image is entry.image for i, e in enumerate(self._entries) if i != index):
+            return False            # shared reference: dropping it would free nothing
+        if entry.recipe is None and entry.delta is None:
+            if not np.issubdtype(entry.dtype, np.integer):
+                return False        # float deltas would not round-trip exactly
+            previous = self._materialize(index - 1)
+            if previous.shape != entry.shape or previous.dtype != entry.dtype:
+                return False
+            delta = zlib.compress(np.subtract(entry.image, previous, dtype=entry.dtype).tobytes(), 1)
+            if len(delta) > _DELTA_MAX_RATIO * entry.image.nbytes:
+                return False
+            entry.delta = delta
+        entry.image = None
+        return True
+
+    def _enforce_budget(self):
+        if self.nbytes() <= self.max_bytes:
+            return
+        # farthest from the cursor first; the cursor's own state stays full
+        order = sorted((i for i in range(1, len(self._entries)) if i != self._cursor),
+                       key=lambda i: -abs(i - self._cursor))
+        for i in order:
+            if self._compact(i) and self.nbytes() <= self.max_bytes:
+                return
+        while self.nbytes() > self.max_bytes and self._cursor > 1:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        """Forget state 1 (the oldest after the first); state 2 is rebased onto state 0."""
+        if len(self._entries) < 3 or self._cursor < 2:
+            return
+        second = self._entries[2]
+        if second.image is None:
+            second.image = self._materialize(2)
+            second.recipe = second.delta = None
+        del self._entries[1]
+        self._cursor -= 1
+
@@ -1,8 +1,11 @@
+import threading
 import numpy as np
 import cv2
-from core.frequency import _gaussian_mask, _fft, _ifft
+from core.frequency import get_mask, forward_spectra, inverse_filtered
+from core import profiling
 
 
+@profiling.profiled("resize")
 def _resize_to_match(img1: np.ndarray, img2: np.ndarray) -> tuple:
     """Resize img2 to match img1's spatial dimensions."""
     h, w = img1.shape[:2]
@@ -10,25 +13,84 @@ def _resize_to_match(img1: np.ndarray, img2: np.ndarray) -> tuple:
     return img1, img2_resized
 
 
-def _apply_gaussian_filter_freq(image: np.ndarray, cutoff: int, low_pass: bool) -> np.ndarray:
-    """
-    Apply a Gaussian low-pass or high-pass filter to an image.
-    Returns uint8 result.
+def _match_inputs(image1: np.ndarray, image2: np.ndarray) -> tuple:
+    """Resize image2 to image1's size and bring both to the same colour space."""
+    image1, image2 = _resize_to_match(image1, image2)
+    is_color1 = len(image1.shape) == 3
+    is_color2 = len(image2.shape) == 3
+
+    if is_color1 and not is_color2:
+        image2 = cv2.cvtColor(image2, cv2.COLOR_GRAY2BGR)
+    elif is_color2 and not is_color1:
+        image1 = cv2.cvtColor(image1, cv2.COLOR_GRAY2BGR)
+    return image1, image2
+
+
+class HybridBuilder:
     """
-    is_color = len(image.shape) == 3
-    channels = cv2.split(image) if is_color else [image]
-    shape = channels[0].shape
-    mask = _gaussian_mask(shape, cutoff, low_pass)
+    Hybrid-image state kept across parameter changes.
 
-    filtered = []
-    for ch in channels:
-        ch_float = ch.astype(np.float32) / 255.0
-        f_shift = _fft(ch_float)
-        f_filtered = f_shift * mask
-        result = _ifft(f_filtered)
-        filtered.append(result)
+    The matched (resized, colour-converted) inputs and their forward spectra are
+    computed once per loaded pair, so a cutoff or pass change costs one mask
+    multiply and inverse FFT for the affected image, and an alpha change costs
+    only the blend. Safe to share between the GUI thread and a worker thread.
+    """
 
-    return cv2.merge(filtered) if is_color else filtered[0]
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = [None, None]
+        self._matched = None                 # (image1, image2) after _match_inputs
+        self._spectra = [None, None]
+        self._filtered = [None, None]        # ((cutoff, low_pass), uint8 image) per slot
+
+    def set_image(self, slot: int, image: np.ndarray):
+        """Load image 1 or 2. Image 1 sets the working size, so changing it resets both slots."""
+        with self._lock:
+            self._sources[slot - 1] = image
+            self._matched = None
+            for i in ((0, 1) if slot == 1 else (1,)):
+                self._spectra[i] = None
+                self._filtered[i] = None
+
+    def _inputs(self) -> tuple:
+        if self._matched is None:
+            if self._sources[0] is None or self._sources[1] is None:
+                raise ValueError("Both images must be provided.")
+            self._matched = _match_inputs(*self._sources)
+            # a colour-space change of image1 (gray paired with colour) invalidates its spectra too
+            if self._spectra[0] is not None and self._spectra[0].shape[0] != (
+                    self._matched[0].shape[2] if self._matched[0].ndim == 3 else 1):
+                self._spectra[0] = None
+                self._filtered[0] = None
+        return self._matched
+
+    def _filter(self, i: int, cutoff: int, low_pass: bool) -> np.ndarray:
+        params = (cutoff, low_pass)
+        if self._filtered[i] is not None and self._filtered[i][0] == params:
+            return self._filtered[i][1]
+        image = self._inputs()[i]
+        if self._spectra[i] is None:
+            self._spectra[i] = forward_spectra(image)
+        mask = get_mask(image.shape[:2], "gaussian", cutoff, low_pass)
+        filtered = inverse_filtered(self._spectra[i], mask, image.shape[:2])
+        self._filtered[i] = (params, filtered)
+        return filtered
+
+    def create(self, low_cutoff: int = 30, high_cutoff: int = 20, alpha: float = 0.5,
+               low_pass1: bool = True, low_pass2: bool = False) -> tuple:
+        """Same parameters and return value as ``create_hybrid_image``."""
+        # Filter each image with its own settings
+        with self._lock:
+            img1_filtered = self._filter(0, low_cutoff, low_pass1)
+            img2_filtered = self._filter(1, high_cutoff, low_pass2)
+
+        # Blend
+        with profiling.stage("blend"):
+            hybrid_f = cv2.addWeighted(img1_filtered, alpha, img2_filtered, 1.0 - alpha, 0.0,
+                                       dtype=cv2.CV_32F)
+            hybrid = np.clip(hybrid_f, 0, 255).astype(np.uint8)
+
+        return hybrid, img1_filtered, img2_filtered
 
 
 def create_hybrid_image(
@@ -62,27 +124,10 @@ def create_hybrid_image(
     if image1 is None or image2 is None:
         raise ValueError("Both images must be provided.")
 
-    # Match sizes and colour spaces
-    image1, image2 = _resize_to_match(image1, image2)
-    is_color1 = len(image1.shape) == 3
-    is_color2 = len(image2.shape) == 3
-
-    if is_color1 and not is_color2:
-        image2 = cv2.cvtColor(image2, cv2.COLOR_GRAY2BGR)
-    elif is_color2 and not is_color1:
-        image1 = cv2.cvtColor(image1, cv2.COLOR_GRAY2BGR)
-
-    # Filter each image with its own settings
-    img1_filtered = _apply_gaussian_filter_freq(image1, cutoff=low_cutoff,  low_pass=low_pass1)
-    img2_filtered = _apply_gaussian_filter_freq(image2, cutoff=high_cutoff, low_pass=low_pass2)
-
-    # Blend
-    low_f  = img1_filtered.astype(np.float32)
-    high_f = img2_filtered.astype(np.float32)
-    hybrid_f = alpha * low_f + (1.0 - alpha) * high_f
-    hybrid = np.clip(hybrid_f, 0, 255).astype(np.uint8)
-
-    return hybrid, img1_filtered, img2_filtered
+    builder = HybridBuilder()
+    builder.set_image(1, image1)
+    builder.set_image(2, image2)
+    return builder.create(low_cutoff, high_cutoff, alpha, low_pass1, low_pass2)
 
 
 def visualize_hybrid_scales(hybrid: np.ndarray, scales: int = 5) -> list:
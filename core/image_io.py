@@ -0,0 +1,192 @@
+"""
+Image decoding with shared in-memory and on-disk caches.
+
+Decoded arrays are cached in memory by file identity (absolute path, mtime and
+size), so opening the same file in several tabs decodes it once. Decodes that
+were slow (large JPEG/PNG files) are also written as raw ``.npy`` files to a disk
+cache, which reads back much faster than decoding. The disk cache is opt-in: it
+is used only when ``$IMAGE_APP_CACHE_DIR`` names a directory, and is bounded in
+size, oldest files removed first.
+
+``read_preview`` decodes JPEG files at reduced resolution
+(``cv2.IMREAD_REDUCED_*``, native for JPEG by skipping DCT coefficients), with
+the level chosen from the size in the file header, for when only a preview is
+needed. Returned arrays are shared and read-only.
+"""
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+import cv2
+from core.cache import LRUCache
+from core import profiling
+
+_REDUCED = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+            4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+_DECODED = LRUCache(max_bytes=512 << 20)
+# only decodes slower than this go to disk: reading raw pixels back beats them comfortably
+_DISK_MIN_SECONDS = 0.02
+_DISK_MAX_BYTES = 2 << 30
+_disk_lock = threading.Lock()
+
+
+def cache_dir():
+    """Disk cache directory, or None when disabled (the default)."""
+    path = os.environ.get("IMAGE_APP_CACHE_DIR", "")
+    if path.lower() in ("", "0", "off", "none"):
+        return None
+    return os.path.expanduser(path)
+
+
+def _file_key(path: str, reduce: int) -> tuple:
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise FileNotFoundError(f"Image not found at path: {path}") from None
+    return path, st.st_mtime_ns, st.st_size, reduce
+
+
+def read_image(path: str, reduce: int = 1) -> np.ndarray:
+    """
+    BGR image at ``path``, decoded at 1/``reduce`` of its resolution (1, 2, 4 or 8).
+    Served from memory or the disk cache when the file has not changed.
+    """
+    if reduce not in _REDUCED:
+        raise ValueError(f"reduce must be one of {sorted(_REDUCED)}, got {reduce}")
+    key = _file_key(path, reduce)
+    image = _DECODED.get(key)
+    if image is None:
+        image = _read_disk(key)
+        if image is None:
+            start = time.perf_counter()
+            with profiling.stage("imread"):
+                image = cv2.imread(path, _REDUCED[reduce])
+            if image is None:
+                raise FileNotFoundError(f"Image not found at path: {path}")
+            if time.perf_counter() - start >= _DISK_MIN_SECONDS:
+                _write_disk(key, image)
+        image.setflags(write=False)     # shared by every caller
+        _DECODED.put(key, image)
+    return image
+
+
+def read_preview(path: str, max_side: int):
+    """
+    A JPEG file decoded once, at the smallest reduction whose longer side is
+    still at least ``max_side`` pixels. None when a preview would cost as much
+    as the full decode: other formats (``IMREAD_REDUCED_*`` decodes them fully,
+    then resizes) and images not larger than ``max_side``.
+    """
+    size = jpeg_size(path)
+    if size is None:
+        return None
+    reduce = 8
+    while reduce > 1 and max(size) // reduce < max_side:
+        reduce //= 2
+    return read_image(path, reduce) if reduce > 1 else None
+
+
+def jpeg_size(path: str):
+    """(height, width) from the frame header of a JPEG file, or None if it is not one."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(2) != b"\xff\xd8":
+                return None
+            while True:
+                marker = f.read(2)
+                while marker[1:] == b"\xff":           # fill bytes before a marker
+                    marker = marker[1:] + f.read(1)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                if marker[1] == 0x01 or 0xD0 <= marker[1] <= 0xD7:
+                    continue                            # no length field
+                length = int.from_bytes(f.read(2), "big")
+                # SOF0..SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+                if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                    header = f.read(5)
+                    if len(header) < 5:
+                        return None
+                    return int.from_bytes(header[1:3], "big"), int.from_bytes(header[3:5], "big")
+                if length < 2:
+                    return None
+                f.seek(length - 2, os.SEEK_CUR)
+    except OSError:
+        return None
+
+
+# ---- disk cache ----
+
+def _disk_path(key: tuple):
+    directory = cache_dir()
+    if directory is None:
+        return None
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(directory, digest + ".npy")
+
+
+def _read_disk(key: tuple):
+    path = _disk_path(key)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with profiling.stage("cache read"):
+            image = np.load(path, allow_pickle=False)
+        os.utime(path)                  # recently used: evicted last
+        return image
+    except (OSError, ValueError):
+        return None                     # partial or corrupt file: decode again
+
+
+def _write_disk(key: tuple, image: np.ndarray):
+    path = _disk_path(key)
+    if path is None:
+        return
+    with profiling.stage("cache write"), _disk_lock:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, image, allow_pickle=False)
+            os.replace(tmp, path)
+            _trim_disk(os.path.dirname(path))
+        except OSError:
+            pass                        # a cache: failing to write only costs speed
+
+
+def _trim_disk(directory: str):
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".npy"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= _DISK_MAX_BYTES:
+            break
+        os.remove(path)
+        total -= size
+
+
+# ---- maintenance ----
+
+def io_cache_stats() -> dict:
+    """Memory cache counters plus the size of the disk cache."""
+    stats = _DECODED.stats()
+    directory = cache_dir()
+    files = []
+    if directory is not None and os.path.isdir(directory):
+        files = [e.stat().st_size for e in os.scandir(directory) if e.name.endswith(".npy")]
+    stats.update(disk_dir=directory, disk_files=len(files), disk_bytes=sum(files))
+    return stats
+
+
+def clear_io_cache(disk: bool = False):
+    _DECODED.clear()
+    directory = cache_dir()
+    if disk and directory is not None and os.path.isdir(directory):
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".npy"):
+                os.remove(entry.path)
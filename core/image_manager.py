@@ -1,47 +1,233 @@
 import cv2
 import numpy as np
-from numpy.lib.stride_tricks import sliding_window_view
+from core.frequency import fft_convolve
+from core import profiling
+from core.history import History
+from core.image_io import read_image
 
 
 class ImageManager:
-    def __init__(self):
+    def __init__(self, history_bytes: int = 512 << 20):
         self.original_image = None
         self.current_image = None
         self.gray_image = None
+        # images are never modified in place, so states share arrays instead of copying them
+        self.history = History(max_bytes=history_bytes)
 
     @staticmethod
-    def convolve(image: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    def separate_kernel(kernel: np.ndarray):
+        """
+        Split a rank-1 (separable) 2-D kernel into a (column, row) pair of 1-D
+        vectors such that ``np.outer(column, row) == kernel``.
+        Returns None when the kernel is not separable.
+        """
+        kernel = np.asarray(kernel, dtype=np.float64)
+        # pivot on the largest entry: column = kernel[:, j], row = kernel[i, :] / kernel[i, j]
+        i, j = np.unravel_index(np.argmax(np.abs(kernel)), kernel.shape)
+        pivot = kernel[i, j]
+        if pivot == 0:
+            return None
+        column = kernel[:, j].copy()
+        row = kernel[i, :] / pivot
+        if not np.allclose(np.outer(column, row), kernel, rtol=0, atol=1e-12 * abs(pivot)):
+            return None
+        return column, row
+
+    @staticmethod
+    def _block_rows(out: np.ndarray) -> int:
+        """Rows per block so that one block of scratch space stays around 1 MB (cache-sized)."""
+        return max(1, (1 << 20) // (out[0].size * out.itemsize))
+
+    @staticmethod
+    def _correlate_direct(padded: np.ndarray, kernel: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Correlate a padded array with a 2-D kernel into ``out`` by accumulating one
+        shifted view per tap. Unlike an einsum over a sliding-window view this stays
+        contiguous in memory and handles any trailing channel axis in the same pass.
+        Work is done in row blocks, so the only temporary is a small scratch block
+        and ``padded`` can stay in its original (e.g. uint8) dtype.
+        """
+        out_h, out_w = out.shape[:2]
+        rows = ImageManager._block_rows(out)
+        scratch = np.empty((rows,) + out.shape[1:], dtype=out.dtype)
+        for r0 in range(0, out_h, rows):
+            r1 = min(r0 + rows, out_h)
+            acc, sc = out[r0:r1], scratch[:r1 - r0]
+            acc[...] = 0
+            for i in range(kernel.shape[0]):
+                for j in range(kernel.shape[1]):
+                    if kernel[i, j] != 0:
+                        np.multiply(padded[r0 + i:r1 + i, j:j + out_w], kernel[i, j], out=sc)
+                        acc += sc
+        return out
+
+    @staticmethod
+    def _correlate_separable(padded: np.ndarray, column: np.ndarray, row: np.ndarray,
+                             out: np.ndarray) -> np.ndarray:
+        """Two 1-D correlation passes (vertical then horizontal) over a padded array, into ``out``."""
+        out_h, out_w = out.shape[:2]
+        rows = ImageManager._block_rows(out)
+        tmp = np.empty((rows,) + padded.shape[1:], dtype=out.dtype)
+        scratch = np.empty_like(tmp)
+        for r0 in range(0, out_h, rows):
+            r1 = min(r0 + rows, out_h)
+            t, sc = tmp[:r1 - r0], scratch[:r1 - r0]
+            t[...] = 0
+            for i, weight in enumerate(column):
+                if weight != 0:                      # e.g. the middle tap of Sobel / Prewitt
+                    np.multiply(padded[r0 + i:r1 + i], weight, out=sc)
+                    t += sc
+
+            acc, sc = out[r0:r1], sc[:, :out_w]
+            acc[...] = 0
+            for j, weight in enumerate(row):
+                if weight != 0:
+                    np.multiply(t[:, j:j + out_w], weight, out=sc)
+                    acc += sc
+        return out
+
+    @staticmethod
+    def choose_convolution_method(image_shape: tuple, k_h: int, k_w: int, separable: bool) -> str:
+        """
+        Cost model: direct convolution is O(taps) per pixel, FFT convolution is
+        O(log n) per pixel of the padded transform and independent of kernel size.
+        Both constants were measured to be within a few percent of each other
+        (~3 ns per tap-pixel vs ~3 ns per n*log2(n)), so they compare directly.
+        """
+        h, w = image_shape[:2]
+        taps = (k_h + k_w) if separable else (k_h * k_w)
+        direct_cost = h * w * taps
+        n = (h + k_h) * (w + k_w)
+        fft_cost = n * np.log2(n)
+        return "fft" if fft_cost < direct_cost else "direct"
+
+    @staticmethod
+    def convolve(image: np.ndarray, kernel, method: str = "auto", dtype=np.float64,
+                 out: np.ndarray = None, border: str = "edge") -> np.ndarray:
+        """
+        Convolve an image with a 2-D kernel, or with a separable kernel given as a
+        ``(column, row)`` pair of 1-D vectors.
+
+        Rank-1 kernels (average, Gaussian, Sobel, Prewitt, ...) are detected and run
+        as two 1-D passes, O(k_h + k_w) per pixel instead of O(k_h * k_w).
+        ``method`` is "direct", "fft" or "auto"; "auto" picks whichever the cost
+        model in ``choose_convolution_method`` predicts is cheaper, so large kernels
+        run through the FFT in time independent of their size.
+
+        Gray and colour images share one code path: all channels are padded once
+        with the ``border`` mode (any ``np.pad`` mode) and filtered in a single
+        vectorized call. Arithmetic runs in ``dtype`` (float32 halves memory), into
+        ``out`` when a preallocated buffer of the image's shape is given.
+        Gray images return the raw ``dtype`` result; colour images return a new uint8
+        array clipped from it (``out`` is left unclipped).
+        The output always has the input's spatial size, also for even-sized kernels.
+        """
+        if isinstance(kernel, (tuple, list)):
+            column, row = (np.asarray(v, dtype=np.float64).ravel() for v in kernel)
+            separable = (column, row)
+            kernel = np.outer(column, row)
+        else:
+            kernel = np.asarray(kernel, dtype=np.float64)
+            separable = ImageManager.separate_kernel(kernel)
+            column, row = separable if separable is not None else (None, None)
+
         k_h, k_w = kernel.shape
-        pad_h, pad_w = k_h // 2, k_w // 2
-        flipped = np.flipud(np.fliplr(kernel))   # flip for convolution
+        if method == "auto":
+            method = ImageManager.choose_convolution_method(image.shape, k_h, k_w, separable is not None)
+        if method not in ("direct", "fft"):
+            raise ValueError(f"Unknown convolution method: {method!r}")
+
+        if out is None:
+            out = np.empty(image.shape, dtype=dtype)
+        elif out.shape != image.shape:
+            raise ValueError(f"Output buffer has shape {out.shape}, expected {image.shape}")
+
+        # pad the spatial axes only; (k - 1) // 2 before and k // 2 after keeps the size for even kernels
+        pad = [((k_h - 1) // 2, k_h // 2), ((k_w - 1) // 2, k_w // 2)] + [(0, 0)] * (image.ndim - 2)
+        with profiling.stage("pad"):
+            padded = np.pad(image, pad, mode=border)   # stays in the input dtype; cast per block
+            profiling.allocated(padded.nbytes)
+
+        if method == "fft":
+            with profiling.stage("fft convolve"):
+                out[...] = fft_convolve(padded, kernel)
+        elif separable is not None:
+            # flip for convolution
+            with profiling.stage("correlate separable"):
+                ImageManager._correlate_separable(padded, column[::-1].astype(out.dtype),
+                                                  row[::-1].astype(out.dtype), out)
+        else:
+            flipped = np.flipud(np.fliplr(kernel)).astype(out.dtype)   # flip for convolution
+            with profiling.stage("correlate"):
+                ImageManager._correlate_direct(padded, flipped, out)
 
         # gray image
         if image.ndim == 2:
-            padded = np.pad(image.astype(np.float64),
-                            ((pad_h, pad_h), (pad_w, pad_w)), mode='constant')
-            windows = sliding_window_view(padded, (k_h, k_w))
-            return np.einsum('ijkl,kl->ij', windows, flipped)
+            return out
         # colored image
-        else:
-            out = np.zeros(image.shape, dtype=np.float64)
-            for c in range(image.shape[2]):
-                padded = np.pad(image[:, :, c].astype(np.float64),
-                                ((pad_h, pad_h), (pad_w, pad_w)), mode='edge')
-                windows = sliding_window_view(padded, (k_h, k_w))
-                out[:, :, c] = np.einsum('ijkl,kl->ij', windows, flipped)
-            return np.clip(out, 0, 255).astype(np.uint8)  # clipping is better for colored images
+        with profiling.stage("clip"):
+            return ImageManager.clip_to_uint8(out)  # clipping is better for colored images
 
-    def read_image(self, path):
-        image = cv2.imread(path)
-        if image is None:
-            raise FileNotFoundError(f"Image not found at path: {path}")
+    @staticmethod
+    def clip_to_uint8(values: np.ndarray) -> np.ndarray:
+        """
+        Colour filter output as uint8: clipped to [0, 255], then truncated, straight
+        into a new array (``values`` keeps the raw values).
+        """
+        result = np.empty(values.shape, dtype=np.uint8)
+        np.clip(values, 0, 255, out=result, casting="unsafe")
+        return result
+
+    @staticmethod
+    @profiling.profiled("decode")
+    def decode(path):
+        # shared with other tabs and kept in the decode caches: read-only
+        return read_image(path)
+
+    def set_image(self, image):
         self.original_image = image
-        self.current_image = image.copy()
-        self.gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)  # always compute once on load
+        self.current_image = image
+        with profiling.stage("gray"):
+            self.gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)  # always compute once on load
+        self.gray_image.setflags(write=False)       # shared by the tabs (and their memoized statistics)
+        self.history.reset(image)
         return self.current_image
 
+    def read_image(self, path):
+        return self.set_image(self.decode(path))
+
     def reset_image(self):
         if self.original_image is not None:
-            self.current_image = self.original_image.copy()
-            self.gray_image = cv2.cvtColor(self.original_image, cv2.COLOR_BGR2GRAY)
-            return self.current_image
\ No newline at end of file
+            # a reference to the original: costs no memory in the history
+            return self.push_image(self.original_image, "reset")
+
+    def push_image(self, image, label="edit", recipe=None):
+        """Make ``image`` the current image and record it in the undo history."""
+        self.current_image = self.history.push(image, label, recipe)
+        return self.current_image
+
+    def apply(self, func, label=None, **params):
+        """
+        Apply ``func(current_image, **params)`` as an undoable edit. ``func`` must be
+        deterministic: the history may drop the result and recompute it from the
+        previous state.
+        """
+        if self.current_image is None:
+            return None
+        result = func(self.current_image, **params)
+        if result is not self.current_image:
+            result.setflags(write=False)            # a history state: never edited in place
+        return self.push_image(result, label or getattr(func, "__name__", "edit"),
+                               lambda previous: func(previous, **params))
+
+    def undo(self):
+        image = self.history.undo()
+        if image is not None:
+            self.current_image = image
+        return image
+
+    def redo(self):
+        image = self.history.redo()
+        if image is not None:
+            self.current_image = image
+        return image
@@ -1,47 +1,134 @@
+import weakref
 import numpy as np
+from core.cache import LRUCache
+from core import profiling
 
-def add_noise(image, noise_type, amount):
-    if noise_type == "Gaussian":
-        return gaussian_noise(image, amount)
+# base noise fields per image (or explicit seed) and noise type; a slider change only
+# rescales / re-thresholds them. Fields are float32, so 1 GB holds the Gaussian and
+# uniform fields (288 MB each) and the salt-and-pepper field (96 MB) of a 24 MP colour image.
+_FIELD_CACHE = LRUCache(max_bytes=1 << 30)
 
-    elif noise_type == "Uniform":
-        return uniform_noise(image, amount)
 
-    elif noise_type == "Salt & Pepper":
-        return salt_pepper_noise(image, amount)
+@profiling.profiled("noise")
+def add_noise(image, noise_type, amount, seed=None, cache=True):
+    """
+    Add noise of ``noise_type`` with strength ``amount`` to a uint8 image.
 
-    return image
+    Without a ``seed`` every image array gets its own random field per noise type,
+    cached while the array lives, so calls that differ only in ``amount`` reuse it.
+    A ``seed`` (int or sequence of ints) gives the same noise every time, for any
+    image of that shape. ``cache=False`` draws the field without caching it (e.g.
+    for a stream of frames or tiles that are never seen again).
+    """
+    if noise_type not in _NOISE:
+        return image
+    if seed is None and cache:
+        field = _image_field(image, noise_type)
+    else:
+        field = noise_field(image.shape, noise_type, seed, cache)
+    return _NOISE[noise_type](image, amount, field)
 
 
-def gaussian_noise(image, amount):
-    mean = 0
-    sigma = amount * 50  # control strength
-    gauss = np.random.normal(mean, sigma, image.shape).astype(np.float32)
+def noise_field(shape, noise_type, seed=None, cache=True):
+    """
+    Base float32 field for ``noise_type``, read-only when it comes from the cache.
+    ``seed=None`` draws fresh entropy and is never cached.
+    """
+    if seed is None or not cache:
+        return _build_field(shape, noise_type, seed)
+    key = (tuple(shape), noise_type, tuple(np.atleast_1d(seed).tolist()))
+    return _FIELD_CACHE.get_or_create(key, lambda: _build_field(shape, noise_type, seed, read_only=True))
 
-    noisy = image.astype(np.float32) + gauss
-    noisy = np.clip(noisy, 0, 255)
 
-    return noisy.astype(np.uint8)
+def _image_field(image, noise_type):
+    """The field of one image array; dropped from the cache when the array is collected."""
+    key = (tuple(image.shape), noise_type, ("image", id(image)))
+    field = _FIELD_CACHE.get(key)
+    if field is None:
+        field = _FIELD_CACHE.put(key, _build_field(image.shape, noise_type, None, read_only=True))
+        # ids are reused after collection: a new array must never inherit this field
+        weakref.finalize(image, _FIELD_CACHE.pop, key, None)
+    return field
 
 
-def uniform_noise(image, amount):
-    low = -amount * 50
-    high = amount * 50
-    noise = np.random.uniform(low, high, image.shape)
+def _build_field(shape, noise_type, seed, read_only=False):
+    with profiling.stage("noise field"):
+        field = _FIELDS[noise_type](np.random.default_rng(seed), shape)
+    field.flags.writeable = not read_only
+    return field
+
+
+def noise_cache_stats() -> dict:
+    """Hit/miss/eviction counters and memory use of the noise-field cache."""
+    return _FIELD_CACHE.stats()
+
+
+def clear_noise_cache():
+    _FIELD_CACHE.clear()
+
+
+# ---- base fields (amount-independent) ----
+
+def _normal_field(rng, shape):
+    return rng.standard_normal(shape, dtype=np.float32)
+
+
+def _symmetric_uniform_field(rng, shape):
+    # uniform in [-1, 1)
+    field = rng.random(shape, dtype=np.float32)
+    field *= 2
+    field -= 1
+    return field
 
-    noisy = image.astype(np.float32) + noise
-    noisy = np.clip(noisy, 0, 255)
 
+def _unit_uniform_field(rng, shape):
+    # one value per pixel, shared by all channels
+    return rng.random(shape[:2], dtype=np.float32)
+
+
+# ---- applying a field at a given amount ----
+
+def _add_scaled(image, field, scale):
+    noisy = np.multiply(field, np.float32(scale), dtype=np.float32)
+    noisy += image
+    np.clip(noisy, 0, 255, out=noisy)
     return noisy.astype(np.uint8)
 
 
-def salt_pepper_noise(image, amount):
+def gaussian_noise(image, amount, field=None):
+    sigma = amount * 50  # control strength
+    if field is None:
+        field = noise_field(image.shape, "Gaussian")
+    return _add_scaled(image, field, sigma)
+
+
+def uniform_noise(image, amount, field=None):
+    high = amount * 50
+    if field is None:
+        field = noise_field(image.shape, "Uniform")
+    return _add_scaled(image, field, high)
+
+
+def salt_pepper_noise(image, amount, field=None):
     noisy = image.copy()
     prob = amount
+    if field is None:
+        field = noise_field(image.shape, "Salt & Pepper")
+
+    noisy[field < prob / 2] = 0
+    noisy[field > 1 - prob / 2] = 255
+
+    return noisy
 
-    rnd = np.random.rand(*image.shape[:2])
 
-    noisy[rnd < prob / 2] = 0
-    noisy[rnd > 1 - prob / 2] = 255
+_FIELDS = {
+    "Gaussian": _normal_field,
+    "Uniform": _symmetric_uniform_field,
+    "Salt & Pepper": _unit_uniform_field,
+}
 
-    return noisy
\ No newline at end of file
+_NOISE = {
+    "Gaussian": gaussian_noise,
+    "Uniform": uniform_noise,
+    "Salt & Pepper": salt_pepper_noise,
+}
@@ -1,18 +1,36 @@
 import numpy as np
+from core.statistics import image_stats
+from core import profiling
 
+@profiling.profiled("normalize")
 def normalize_image(image: np.ndarray) -> np.ndarray:
 
-    img = image.astype(np.float64)
-    
+    if image.dtype == np.uint8:
+        # min / max come from the memoized histogram; the scaling is a 256-entry lookup table
+        stats = image_stats(image)
+        return stretch_range(image, int(stats.min.min()), int(stats.max.max()))
+
     # Find min and max values
-    min_val = img.min()
-    max_val = img.max()
-    
+    return stretch_range(image, image.min(), image.max())
+
+
+def stretch_range(image: np.ndarray, min_val, max_val) -> np.ndarray:
+    """
+    ``image`` with [min_val, max_val] scaled to [0, 255] as uint8, exactly as
+    ``normalize_image`` does with the image's own range (tiled processing passes
+    the global range of the whole image).
+    """
+    min_val, max_val = float(min_val), float(max_val)
     # Avoid division by zero if image is flat
     if max_val == min_val:
         return np.zeros_like(image, dtype=np.uint8) # returns a black image
-    
+
+    if image.dtype == np.uint8:
+        levels = np.arange(256, dtype=np.float64)
+        lookup_table = ((levels - min_val) / (max_val - min_val) * 255).clip(0, 255).astype(np.uint8)
+        return lookup_table[image]
+
     # Scale to 0-255 range: (pixel - min) / (max - min) * 255
-    normalized = (img - min_val) / (max_val - min_val) * 255
-    
+    normalized = (image.astype(np.float64) - min_val) / (max_val - min_val) * 255
+
     return normalized.astype(np.uint8)
@@ -0,0 +1,126 @@
+import inspect
+import numpy as np
+import cv2
+from core.noise import add_noise
+from core.filters import apply_filter
+from core.edges import sobel_edge_detection, prewitt_edge_detection, roberts_edge_detection, canny_edge_detection
+from core.frequency import apply_frequency_filter
+from core.hybrid import create_hybrid_image
+from core.image_io import read_image
+from core.histogram import Histogram
+from core.normalize import normalize_image
+
+
+def _as_gray(image: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def op_gray(image):
+    return _as_gray(image)
+
+
+def op_noise(image, noise_type="Gaussian", amount=0.1, seed=None, cache=True):
+    return add_noise(image, noise_type, float(amount), seed, cache)
+
+
+def op_filter(image, filter_type="Average (3x3)", kernel_size=None):
+    return apply_filter(image, filter_type, kernel_size)
+
+
+def edge_magnitude(image, method="Sobel"):
+    """Raw (un-normalized) gradient magnitude of the gray image for Sobel / Prewitt / Roberts."""
+    gray = _as_gray(image)
+    if method == "Sobel":
+        edges, _, _ = sobel_edge_detection(gray)
+    elif method == "Prewitt":
+        edges, _, _ = prewitt_edge_detection(gray)
+    elif method == "Roberts":
+        edges, _, _ = roberts_edge_detection(gray)
+    else:
+        raise ValueError(f"Unknown edge method: {method!r}")
+    return edges
+
+
+def op_edges(image, method="Sobel", low_threshold=50, high_threshold=150):
+    if method == "Canny":
+        return canny_edge_detection(_as_gray(image), int(low_threshold), int(high_threshold))
+    return normalize_image(edge_magnitude(image, method))
+
+
+def op_frequency(image, filter_type="ideal", pass_type="low", cutoff=30, order=2):
+    filtered, _ = apply_frequency_filter(image, filter_type, pass_type, int(cutoff), int(order))
+    return filtered
+
+
+def op_hybrid(image, other, low_cutoff=30, high_cutoff=20, alpha=0.5, low_pass1=True, low_pass2=False):
+    image2 = read_image(other) if isinstance(other, str) else other     # decoded once per batch worker
+    hybrid, _, _ = create_hybrid_image(image, image2, int(low_cutoff), int(high_cutoff),
+                                       float(alpha), bool(low_pass1), bool(low_pass2))
+    return hybrid
+
+
+def op_equalize(image):
+    return Histogram.equalize_gray(_as_gray(image))
+
+
+def op_normalize(image):
+    return normalize_image(image)
+
+
+# name → callable(image, **params) -> uint8 image
+OPERATIONS = {
+    "gray": op_gray,
+    "noise": op_noise,
+    "filter": op_filter,
+    "edges": op_edges,
+    "frequency": op_frequency,
+    "hybrid": op_hybrid,
+    "equalize": op_equalize,
+    "normalize": op_normalize,
+}
+
+
+def _coerce(value: str):
+    """Turn a command-line parameter string into bool / int / float when possible."""
+    lowered = value.lower()
+    if lowered in ("true", "yes", "on"):
+        return True
+    if lowered in ("false", "no", "off"):
+        return False
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_operation(spec: str) -> tuple:
+    """
+    Parse an operation spec of the form ``name:key=value,key=value``.
+
+    Example: ``noise:noise_type=Salt & Pepper,amount=0.05``
+    """
+    name, _, args = spec.partition(":")
+    name = name.strip()
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+    params = {}
+    for item in filter(None, (a.strip() for a in args.split(","))):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Malformed parameter {item!r} in {spec!r} (expected key=value)")
+        params[key.strip()] = _coerce(value.strip())
+    accepted = list(inspect.signature(OPERATIONS[name]).parameters)[1:]
+    unknown = sorted(set(params) - set(accepted))
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {', '.join(unknown)} for {name!r}; "
+                         f"choose from {', '.join(accepted)}")
+    return name, params
+
+
+def run_chain(image: np.ndarray, chain: list) -> np.ndarray:
+    """Apply a list of ``(name, params)`` operations to an image, in order."""
+    for name, params in chain:
+        image = OPERATIONS[name](image, **params)
+    return image
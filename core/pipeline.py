@@ -0,0 +1,216 @@
+"""
+Lazy, memoized operation graphs.
+
+A pipeline is a set of named nodes, each an operation from
+``core.operations.OPERATIONS`` with its parameters and its input nodes; the
+``"input"`` node is the source image. A node's cache key is derived from its
+operation, its parameters and the keys of its inputs, so changing a parameter
+changes the key of that node and everything downstream of it while upstream
+results keep hitting the cache. Results are computed on demand and kept in a
+byte-bounded LRU cache shared by all pipelines.
+
+Pipelines serialize to JSON (``to_dict`` / ``from_dict``), so the GUI and
+``batch.py --pipeline`` can run the same definitions.
+"""
+import hashlib
+import itertools
+import json
+import threading
+import numpy as np
+from core.cache import LRUCache
+from core.operations import OPERATIONS
+
+SOURCE = "input"
+# shared by every pipeline: a node with the same key in the GUI and in a script is computed once
+_RESULT_CACHE = LRUCache(max_bytes=512 << 20)
+_source_versions = itertools.count(1)
+
+
+def _freeze_value(value):
+    """Hashable stand-in for a parameter value: arrays by content, lists as tuples."""
+    if isinstance(value, np.ndarray):
+        digest = hashlib.blake2b(np.ascontiguousarray(value).data, digest_size=16).hexdigest()
+        return ("array", value.shape, value.dtype.str, digest)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    if isinstance(value, dict):
+        return _freeze(value)
+    return value
+
+
+def _freeze(params: dict) -> tuple:
+    return tuple(sorted((name, _freeze_value(value)) for name, value in params.items()))
+
+
+class Node:
+    def __init__(self, name: str, op: str, params: dict, inputs: list):
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation {op!r}; choose from {', '.join(OPERATIONS)}")
+        self.name = name
+        self.op = op
+        self.params = dict(params)
+        self.inputs = list(inputs)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "op": self.op, "params": self.params, "inputs": self.inputs}
+
+
+class Pipeline:
+    """
+    Named operation nodes over one source image. Nodes take their first input as
+    the image argument; operations are the ones ``batch.py`` exposes, with the
+    same parameters. Returned arrays are shared through the cache and marked
+    read-only. Thread-safe: parameters may change on the GUI thread while a
+    worker is computing a result.
+    """
+
+    def __init__(self, cache: LRUCache = None):
+        self.cache = cache if cache is not None else _RESULT_CACHE
+        self.nodes = {}                 # name → Node, in insertion order
+        self._source = None
+        self._source_key = None
+        self._lock = threading.Lock()
+
+    # ---- building ----
+
+    def add(self, name: str, op: str, inputs=None, **params) -> "Pipeline":
+        """Add node ``name`` running ``op`` on ``inputs`` (default: the last added node, or the source)."""
+        if name == SOURCE or name in self.nodes:
+            raise ValueError(f"Node name {name!r} is already used")
+        if inputs is None:
+            inputs = [next(reversed(self.nodes)) if self.nodes else SOURCE]
+        elif isinstance(inputs, str):
+            inputs = [inputs]
+        for parent in inputs:
+            if parent != SOURCE and parent not in self.nodes:
+                raise ValueError(f"Unknown input node {parent!r} for {name!r}")
+        with self._lock:
+            self.nodes[name] = Node(name, op, params, inputs)
+        return self
+
+    def set_params(self, name: str, **params):
+        """Update parameters of ``name``; only it and its downstream nodes get new keys."""
+        with self._lock:
+            self.nodes[name].params.update(params)
+
+    def set_source(self, image, key=None):
+        """
+        Set the source image. ``key`` identifies its content (e.g. a file path plus
+        modification time) so equal sources share cached results across pipelines;
+        by default every call counts as a new image.
+        """
+        with self._lock:
+            self._source = image
+            self._source_key = key if key is not None else ("image", next(_source_versions))
+
+    # ---- evaluation ----
+
+    def key(self, name: str) -> tuple:
+        with self._lock:
+            return self._key(name, {})
+
+    def _key(self, name: str, memo: dict) -> tuple:
+        if name == SOURCE:
+            if self._source_key is None:
+                raise ValueError("Pipeline has no source image")
+            return self._source_key
+        if name not in memo:
+            node = self.nodes[name]
+            memo[name] = (node.op, _freeze(node.params), tuple(self._key(i, memo) for i in node.inputs))
+        return memo[name]
+
+    def result(self, name: str = None):
+        """Output of node ``name`` (default: the last node), computing only what is not cached."""
+        return self.results(name)[0]
+
+    def results(self, *names) -> tuple:
+        """Outputs of several nodes, all from the same parameter snapshot."""
+        with self._lock:
+            names = [n if n is not None else (next(reversed(self.nodes)) if self.nodes else SOURCE)
+                     for n in names]
+            # snapshot keys, parameters and source together so a concurrent change can't mix versions
+            memo, plan = {}, {}
+            for name in names:
+                self._plan(name, memo, plan)
+            source = self._source
+        done = {}
+        return tuple(self._evaluate(name, plan, source, done) for name in names)
+
+    def _plan(self, name: str, memo: dict, plan: dict) -> dict:
+        """name → (key, op, params, input names) for ``name`` and its ancestors."""
+        if name == SOURCE or name in plan:
+            return plan
+        node = self.nodes[name]
+        plan[name] = (self._key(name, memo), node.op, dict(node.params), list(node.inputs))
+        for parent in node.inputs:
+            self._plan(parent, memo, plan)
+        return plan
+
+    def _evaluate(self, name: str, plan: dict, source, done: dict):
+        if name == SOURCE:
+            return source
+        if name in done:                # shared parent of several nodes, even if the cache is full
+            return done[name]
+        key, op, params, inputs = plan[name]
+        value = self.cache.get(key)
+        if value is None:
+            args = [self._evaluate(parent, plan, source, done) for parent in inputs]
+            value = OPERATIONS[op](*args, **params)
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)     # shared through the cache: no in-place edits
+            value = self.cache.put(key, value)
+        done[name] = value
+        return value
+
+    def is_cached(self, name: str) -> bool:
+        return self.key(name) in self.cache
+
+    # ---- serialization ----
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {"nodes": [node.to_dict() for node in self.nodes.values()]}
+
+    @classmethod
+    def from_dict(cls, data: dict, cache: LRUCache = None) -> "Pipeline":
+        pipeline = cls(cache)
+        for node in data["nodes"]:
+            pipeline.add(node["name"], node["op"], node.get("inputs"), **node.get("params", {}))
+        return pipeline
+
+    @classmethod
+    def from_chain(cls, chain: list, cache: LRUCache = None) -> "Pipeline":
+        """Linear pipeline from ``(name, params)`` pairs as produced by ``operations.parse_operation``."""
+        pipeline = cls(cache)
+        for i, (op, params) in enumerate(chain):
+            pipeline.add(f"{i + 1}:{op}", op, **params)
+        return pipeline
+
+    def to_chain(self) -> list:
+        """``(op, params)`` pairs of a linear pipeline (each node fed by the previous one)."""
+        chain, previous = [], SOURCE
+        with self._lock:
+            for node in self.nodes.values():
+                if node.inputs != [previous]:
+                    raise ValueError(f"Pipeline is not linear at node {node.name!r}")
+                chain.append((node.op, dict(node.params)))
+                previous = node.name
+        return chain
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, cache: LRUCache = None) -> "Pipeline":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), cache)
+
+
+def result_cache_stats() -> dict:
+    """Hit/miss/eviction counters and memory use of the shared pipeline result cache."""
+    return _RESULT_CACHE.stats()
+
+
+def clear_result_cache():
+    _RESULT_CACHE.clear()
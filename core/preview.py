@@ -0,0 +1,88 @@
+import threading
+import weakref
+import numpy as np
+import cv2
+from core.filters import _parse_kernel_size
+
+
+class ProxyPyramid:
+    """
+    Reduced-resolution stand-ins for one full-resolution image, used for
+    interactive previews.
+
+    Each level halves the previous one (area-averaged); levels are built on first
+    request and stop at ``min_side`` pixels. ``for_size`` picks the smallest level
+    that is still at least as large as the area it will be shown in, so a preview
+    computed on it looks like the full-resolution result scaled down.
+    """
+
+    def __init__(self, image: np.ndarray, min_side: int = 128):
+        self.image = image
+        self.min_side = min_side
+        self._levels = [image]
+        self._lock = threading.Lock()
+
+    def _level(self, index: int):
+        """Level ``index`` (0 = full resolution), or None when it would be smaller than ``min_side``."""
+        with self._lock:
+            while len(self._levels) <= index:
+                prev = self._levels[-1]
+                h, w = prev.shape[:2]
+                size = ((w + 1) // 2, (h + 1) // 2)
+                if min(size) < self.min_side:
+                    return None
+                self._levels.append(cv2.resize(prev, size, interpolation=cv2.INTER_AREA))
+            return self._levels[index]
+
+    def for_size(self, width: int, height: int) -> tuple:
+        """
+        Proxy for showing the image in a ``width`` x ``height`` area (aspect ratio kept).
+        Returns (proxy, scale) where scale = proxy width / full-resolution width.
+        """
+        h, w = self.image.shape[:2]
+        fit = min(width / w, height / h, 1.0)
+        index = 0
+        while True:
+            candidate = self._level(index + 1)
+            if candidate is None or candidate.shape[1] < fit * w or candidate.shape[0] < fit * h:
+                break
+            index += 1
+        proxy = self._levels[index]
+        return proxy, proxy.shape[1] / w
+
+
+_PYRAMIDS = {}          # id(array) → ProxyPyramid, lives as long as the array
+_PYRAMIDS_LOCK = threading.Lock()
+
+
+def proxy_pyramid(image: np.ndarray) -> ProxyPyramid:
+    """Shared pyramid for ``image``; like image statistics, arrays must not be modified in place."""
+    key = id(image)
+    with _PYRAMIDS_LOCK:
+        pyramid = _PYRAMIDS.get(key)
+        if pyramid is None:
+            pyramid = _PYRAMIDS[key] = ProxyPyramid(image)
+            weakref.finalize(image, _PYRAMIDS.pop, key, None)
+    return pyramid
+
+
+def proxy_for(image: np.ndarray, label) -> tuple:
+    """(proxy, scale) of ``image`` for display in a Qt ``label``."""
+    size = label.size()
+    return proxy_pyramid(image).for_size(max(size.width(), 1), max(size.height(), 1))
+
+
+# ---- parameter scaling ----
+# Spatial parameters are in pixels of the image they are applied to, so on a proxy
+# at ``scale`` they shrink by the same factor to keep the same visual effect.
+
+def scale_kernel_size(size: int, scale: float) -> int:
+    """Odd kernel size covering the same area at ``scale`` (1 = no filtering)."""
+    scaled = max(1, int(round(size * scale)))
+    return scaled if scaled % 2 else scaled + 1
+
+
+def scale_filter(filter_type: str, scale: float, kernel_size: int = None) -> tuple:
+    """(filter_type, kernel_size) arguments for ``apply_filter`` on a proxy."""
+    return filter_type, scale_kernel_size(_parse_kernel_size(filter_type, kernel_size), scale)
+
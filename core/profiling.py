@@ -0,0 +1,267 @@
+"""
+Per-operation profiling.
+
+An *operation* is one user-visible action (load, edges, a filter run, a
+histogram redraw); *stages* are the timed steps inside it (decode, pad,
+correlate, fft, normalize, qimage, ...), recorded with their wall time and the
+bytes they allocated for their result. Finished operations are kept in a short
+history, passed to listeners (the status bar) and can be written as a Chrome
+trace-event file (chrome://tracing, Perfetto) for offline analysis.
+
+Profiling is off unless ``IMAGE_APP_PROFILE`` is set (``IMAGE_APP_PROFILE=trace.json``
+also dumps the trace on exit) or ``enable()`` is called. When off, every hook is a
+single flag check: ``stage`` returns a shared no-op context, ``profiled`` calls
+straight through and no records are created.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+_enabled = False
+_current = contextvars.ContextVar("profiling_operation", default=None)
+_parent = contextvars.ContextVar("profiling_stage", default=None)
+_history = deque(maxlen=500)
+_listeners = []
+_lock = threading.Lock()
+
+
+class Stage:
+    __slots__ = ("name", "parent", "start", "seconds", "nbytes", "thread")
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.nbytes = 0
+        self.thread = threading.get_ident()
+
+
+class Operation:
+    """One profiled operation: its stages, in start order, and its total wall time."""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.seconds = None
+        self.stages = []
+
+    def breakdown(self) -> list:
+        """
+        (stage name, seconds, bytes) summed over the innermost stages (those with no
+        sub-stages), slowest first, so nested timings are not counted twice.
+        """
+        parents = {id(s.parent) for s in self.stages if s.parent is not None}
+        totals = {}
+        for s in self.stages:
+            if id(s) in parents:
+                continue
+            seconds, nbytes = totals.get(s.name, (0.0, 0))
+            totals[s.name] = (seconds + s.seconds, nbytes + s.nbytes)
+        return sorted(((n, t, b) for n, (t, b) in totals.items()), key=lambda item: -item[1])
+
+    def summary(self, limit: int = 6) -> str:
+        total = self.seconds if self.seconds is not None else time.perf_counter() - self.start
+        parts = []
+        for name, seconds, nbytes in self.breakdown()[:limit]:
+            size = f", {nbytes / 2 ** 20:.1f} MB" if nbytes >= 2 ** 20 else ""
+            parts.append(f"{name} {seconds * 1000:.1f} ms{size}")
+        return f"{self.name} {total * 1000:.1f} ms" + (": " + " · ".join(parts) if parts else "")
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _StageContext:
+    __slots__ = ("name", "operation", "stage", "token")
+
+    def __init__(self, name, operation):
+        self.name = name
+        self.operation = operation
+
+    def __enter__(self):
+        self.stage = Stage(self.name, _parent.get())
+        self.token = _parent.set(self.stage)
+        return self.stage
+
+    def __exit__(self, *exc):
+        self.stage.seconds = time.perf_counter() - self.stage.start
+        _parent.reset(self.token)
+        self.operation.stages.append(self.stage)
+        return False
+
+
+# ---- switches ----
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+# ---- operations ----
+
+def begin(name: str):
+    """New Operation, or None when profiling is off. Pair with ``activate`` / ``finish``."""
+    return Operation(name) if _enabled else None
+
+
+class activate:
+    """Make ``operation`` the target of stages recorded in this thread (no-op for None)."""
+
+    __slots__ = ("operation", "token")
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __enter__(self):
+        self.token = _current.set(self.operation) if self.operation is not None else None
+        return self.operation
+
+    def __exit__(self, *exc):
+        if self.token is not None:
+            _current.reset(self.token)
+        return False
+
+
+def finish(operation):
+    """Close ``operation``, store it in the history and notify listeners."""
+    if operation is None:
+        return
+    operation.seconds = time.perf_counter() - operation.start
+    with _lock:
+        _history.append(operation)
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(operation)
+
+
+class operation:
+    """``with operation("edges"):`` — begin, activate and finish in one."""
+
+    __slots__ = ("name", "op", "ctx")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.op = begin(self.name)
+        self.ctx = activate(self.op)
+        return self.ctx.__enter__()
+
+    def __exit__(self, *exc):
+        self.ctx.__exit__(*exc)
+        finish(self.op)
+        return False
+
+
+# ---- stages ----
+
+def stage(name: str):
+    """Context manager timing one stage of the current operation."""
+    if not _enabled:
+        return _NULL_STAGE
+    op = _current.get()
+    return _NULL_STAGE if op is None else _StageContext(name, op)
+
+
+def allocated(nbytes: int):
+    """Add ``nbytes`` to the innermost open stage."""
+    if _enabled:
+        current = _parent.get()
+        if current is not None:
+            current.nbytes += int(nbytes)
+
+
+def _result_bytes(result) -> int:
+    if isinstance(result, (tuple, list)):
+        return sum(_result_bytes(r) for r in result)
+    return int(getattr(result, "nbytes", 0) or 0)
+
+
+def profiled(name: str):
+    """Decorator: run the function as stage ``name`` and record the size of its result."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with stage(name) as s:
+                result = func(*args, **kwargs)
+                if isinstance(s, Stage):
+                    s.nbytes += _result_bytes(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def propagate(func):
+    """Wrap ``func`` so calls on other threads (executors) record into the caller's operation."""
+    if not _enabled or _current.get() is None:
+        return func
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+
+# ---- results ----
+
+def add_listener(callback):
+    """``callback(operation)`` is called (on the finishing thread) for every finished operation."""
+    with _lock:
+        _listeners.append(callback)
+
+
+def remove_listener(callback):
+    with _lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+def history() -> list:
+    with _lock:
+        return list(_history)
+
+
+def last():
+    with _lock:
+        return _history[-1] if _history else None
+
+
+def dump_trace(path: str):
+    """Write the operation history as Chrome trace events (complete "X" events, microseconds)."""
+    pid = os.getpid()
+    events = []
+    for op in history():
+        events.append({"name": op.name, "cat": "operation", "ph": "X", "pid": pid,
+                       "tid": "operations", "ts": op.start * 1e6, "dur": (op.seconds or 0) * 1e6})
+        for s in op.stages:
+            events.append({"name": s.name, "cat": op.name, "ph": "X", "pid": pid, "tid": s.thread,
+                           "ts": s.start * 1e6, "dur": s.seconds * 1e6, "args": {"bytes": s.nbytes}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+_setting = os.environ.get("IMAGE_APP_PROFILE", "")
+if _setting and _setting != "0":
+    enable()
+    if _setting.lower().endswith(".json"):
+        atexit.register(dump_trace, _setting)
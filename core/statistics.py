@@ -0,0 +1,109 @@
+import threading
+import weakref
+import numpy as np
+import cv2
+from core import profiling
+
+
+class ImageStats:
+    """
+    Histogram-derived statistics of one uint8 image.
+
+    hists : (C, 256) float32 per-channel histograms (BGR order for colour images)
+    cdfs  : (C, 256) float64 CDFs normalised to end at 1.0
+    min, max, mean : per-channel values, length C
+    """
+
+    def __init__(self, hists: np.ndarray):
+        self.hists = hists
+        self.pixels = int(hists[0].sum())
+        cumulative = hists.astype(np.float64).cumsum(axis=1)
+        self.cdfs = cumulative / cumulative[:, -1:]
+
+        levels = np.arange(256)
+        occupied = hists > 0
+        self.min = occupied.argmax(axis=1)
+        self.max = 255 - occupied[:, ::-1].argmax(axis=1)
+        self.mean = hists @ levels / self.pixels
+
+    @property
+    def channels(self) -> int:
+        return len(self.hists)
+
+
+@profiling.profiled("statistics")
+def compute_stats(image: np.ndarray) -> ImageStats:
+    """
+    Compute every channel histogram in one scan each; the CDFs, min, max and mean
+    are all derived from the histograms without touching the pixels again.
+    Non-uint8 images are binned like ``cv2.calcHist`` always did: 256 unit-wide
+    bins over [0, 256), values outside ignored.
+    """
+    if image.dtype not in (np.uint8, np.uint16, np.float32):
+        image = image.astype(np.float32)        # the other depths calcHist accepts
+    channels = image.shape[2] if image.ndim == 3 else 1
+    hists = np.stack([cv2.calcHist([image], [c], None, [256], [0, 256]).ravel()
+                      for c in range(channels)])
+    return ImageStats(hists)
+
+
+def _immutable(image: np.ndarray) -> bool:
+    """True if neither ``image`` nor any array it views can be written through."""
+    while isinstance(image, np.ndarray):
+        if image.flags.writeable:
+            return False
+        image = image.base
+    return True
+
+
+class StatisticsService:
+    """
+    Memoizes ``compute_stats`` per image array. Only read-only arrays (whose
+    bases are read-only too) are memoized: their pixels cannot change, so every
+    such array object is one image version and its entry lives exactly as long as
+    the array does. Writable arrays are computed every time; the service never
+    changes the flags of an array it is given. Thread-safe.
+    """
+
+    def __init__(self):
+        self._entries = {}       # id(array) → ImageStats
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image: np.ndarray) -> ImageStats:
+        if not _immutable(image):
+            return compute_stats(image)
+        key = id(image)
+        with self._lock:
+            stats = self._entries.get(key)
+            if stats is not None:
+                self.hits += 1
+                return stats
+        stats = compute_stats(image)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                self._entries[key] = stats
+                weakref.finalize(image, self._entries.pop, key, None)
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_SERVICE = StatisticsService()
+
+
+def image_stats(image: np.ndarray) -> ImageStats:
+    """Shared, memoized statistics for ``image``."""
+    return _SERVICE.get(image)
+
+
+def clear_stats_cache():
+    """Forget memoized statistics (finalizers of already-seen arrays become no-ops)."""
+    _SERVICE.clear()
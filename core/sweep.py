@@ -0,0 +1,134 @@
+"""
+Parameter sweeps for frequency and hybrid filtering.
+
+A sweep transforms its input once and then evaluates every point of a
+parameter grid from the same spectra: masks come from the shared mask cache,
+are applied as one batched multiply per chunk (chunks bounded by ``max_bytes``)
+and the inverse transforms of a chunk run in parallel on the FFT worker
+threads. A sweep of N points costs one forward transform per channel plus N
+inverses, instead of N full filter calls. ``contact_sheet`` lays a result stack
+out as one labelled image for side-by-side comparison.
+"""
+import functools
+import itertools
+import math
+import numpy as np
+import cv2
+from core.frequency import get_mask, forward_spectra, _irfft_into, _map_channels
+from core.hybrid import _match_inputs
+from core import profiling
+
+DEFAULT_SWEEP_BYTES = 256 << 20
+
+
+def _grid(**axes) -> list:
+    """Every combination of the given parameter values, as dicts, last axis varying fastest."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[n] for n in names))]
+
+
+def _filtered_stack(spectra: np.ndarray, shape: tuple, masks: list, max_bytes: int) -> np.ndarray:
+    """
+    uint8 images of ``shape`` for each mask applied to ``spectra`` (from
+    ``forward_spectra``). Masked spectra are built a chunk at a time, so no more
+    than about ``max_bytes`` of them exist at once.
+    """
+    channels = len(spectra)
+    stack = np.empty((len(masks),) + tuple(shape) + ((channels,) if channels > 1 else ()), dtype=np.uint8)
+    per_point = spectra.nbytes
+    chunk = max(1, min(len(masks), max_bytes // max(per_point, 1)))
+    for start in range(0, len(masks), chunk):
+        _filter_chunk(spectra, shape, masks[start:start + chunk], stack[start:start + chunk])
+    return stack
+
+
+def _filter_chunk(spectra: np.ndarray, shape: tuple, masks: list, out: np.ndarray):
+    """One chunk of ``_filtered_stack``; its masked spectra are freed on return."""
+    with profiling.stage("mask"):
+        # (k, 1, H', W'/2+1) * (C, H', W'/2+1) → (k, C, H', W'/2+1)
+        masked = np.stack(masks)[:, None] * spectra[None]
+    jobs = [(i, c) for i in range(len(masks)) for c in range(len(spectra))]
+    _map_channels(functools.partial(_inverse_job, masked, jobs, shape, out), len(jobs))
+
+
+def _inverse_job(masked: np.ndarray, jobs: list, shape: tuple, out: np.ndarray, j: int):
+    i, c = jobs[j]
+    _irfft_into(masked[i, c], shape, out[i], c)
+
+
+@profiling.profiled("frequency sweep")
+def frequency_sweep(image: np.ndarray, filter_type: str = "ideal", pass_type: str = "low",
+                    cutoffs=(30,), orders=(2,), max_bytes: int = DEFAULT_SWEEP_BYTES) -> tuple:
+    """
+    ``apply_frequency_filter`` over every (cutoff, order) combination.
+
+    Returns (params, stack): the list of parameter dicts and a uint8 array with
+    one filtered image per entry, in the same order. ``orders`` only matters for
+    Butterworth filters; other types sweep the cutoffs alone.
+    """
+    axes = {"cutoff": [int(c) for c in cutoffs]}
+    if filter_type == "butterworth":
+        axes["order"] = [int(o) for o in orders]
+    params = _grid(**axes)
+    shape = image.shape[:2]
+    spectra = forward_spectra(image)
+    masks = [get_mask(shape, filter_type, p["cutoff"], pass_type == "low", p.get("order", 2)) for p in params]
+    return params, _filtered_stack(spectra, shape, masks, max_bytes)
+
+
+@profiling.profiled("hybrid sweep")
+def hybrid_sweep(image1: np.ndarray, image2: np.ndarray, low_cutoffs=(30,), high_cutoffs=(20,),
+                 alphas=(0.5,), low_pass1: bool = True, low_pass2: bool = False,
+                 max_bytes: int = DEFAULT_SWEEP_BYTES) -> tuple:
+    """
+    ``create_hybrid_image`` over every (low_cutoff, high_cutoff, alpha) combination.
+
+    Each input is transformed once and filtered once per distinct cutoff; the
+    combinations then only cost a blend. Returns (params, stack) like
+    ``frequency_sweep``.
+    """
+    if image1 is None or image2 is None:
+        raise ValueError("Both images must be provided.")
+    image1, image2 = _match_inputs(image1, image2)
+    shape = image1.shape[:2]
+    low_cutoffs, high_cutoffs = [int(c) for c in low_cutoffs], [int(c) for c in high_cutoffs]
+
+    filtered = []
+    for image, cutoffs, low_pass in ((image1, low_cutoffs, low_pass1), (image2, high_cutoffs, low_pass2)):
+        masks = [get_mask(shape, "gaussian", c, low_pass) for c in cutoffs]
+        filtered.append(_filtered_stack(forward_spectra(image), shape, masks, max_bytes))
+
+    params = _grid(low_cutoff=low_cutoffs, high_cutoff=high_cutoffs, alpha=[float(a) for a in alphas])
+    stack = np.empty((len(params),) + image1.shape, dtype=np.uint8)
+    with profiling.stage("blend"):
+        for i, p in enumerate(params):
+            first = filtered[0][low_cutoffs.index(p["low_cutoff"])]
+            second = filtered[1][high_cutoffs.index(p["high_cutoff"])]
+            blended = cv2.addWeighted(first, p["alpha"], second, 1.0 - p["alpha"], 0.0, dtype=cv2.CV_32F)
+            np.clip(blended, 0, 255, out=blended)
+            stack[i] = blended
+    return params, stack
+
+
+def contact_sheet(stack: np.ndarray, params: list = None, columns: int = None, cell: int = 256) -> np.ndarray:
+    """
+    Tile a result stack into one image, each tile scaled to fit ``cell`` pixels
+    and, when ``params`` are given, captioned with its parameters.
+    """
+    count = len(stack)
+    columns = columns or math.ceil(math.sqrt(count))
+    rows = math.ceil(count / columns)
+    h, w = stack.shape[1:3]
+    scale = min(cell / h, cell / w, 1.0)
+    th, tw = max(1, round(h * scale)), max(1, round(w * scale))
+    sheet = np.zeros((rows * th, columns * tw) + stack.shape[3:], dtype=np.uint8)
+    for i, image in enumerate(stack):
+        r, c = divmod(i, columns)
+        tile = cv2.resize(image, (tw, th), interpolation=cv2.INTER_AREA).reshape(sheet[:th, :tw].shape)
+        if params is not None:
+            caption = " ".join(f"{k}={v:g}" for k, v in params[i].items())
+            colour = (255,) * (3 if tile.ndim == 3 else 1)
+            cv2.putText(tile, caption, (4, th - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.35, 0, 2, cv2.LINE_AA)
+            cv2.putText(tile, caption, (4, th - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.35, colour, 1, cv2.LINE_AA)
+        sheet[r * th:(r + 1) * th, c * tw:(c + 1) * tw] = tile
+    return sheet
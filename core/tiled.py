@@ -0,0 +1,178 @@
+"""
+Tiled, memory-mapped processing for images larger than RAM.
+
+Images live in ``.npy`` files opened as memory maps. Local operations run tile
+by tile, each tile read with a halo wide enough for the operation's kernel, so
+the result is identical to processing the whole image at once while peak
+memory is bounded by the tile size. Exceptions: noise is drawn per tile, and
+the Gaussian filter's float convolution rounds differently per tile, so its
+truncated output can differ by a grey level. Operations that need whole-image
+information are split into a tiled statistics pass and a tiled apply pass
+(normalize, equalize, edge normalization). Frequency-domain operations and
+Canny (global hysteresis) cannot be tiled and are rejected.
+"""
+import itertools
+import os
+import tempfile
+import numpy as np
+import cv2
+from core.filters import filter_radius
+from core.operations import OPERATIONS, edge_magnitude, _as_gray
+from core.noise import add_noise
+from core.normalize import stretch_range
+
+DEFAULT_TILE = 1024
+
+
+def create_memmap(shape: tuple, dtype, path: str = None, work_dir: str = None) -> np.memmap:
+    """New ``.npy``-backed memory map; a temporary file in ``work_dir`` when no path is given."""
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=work_dir)
+        os.close(fd)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=tuple(shape))
+
+
+def open_image_memmap(path: str, work_dir: str = None) -> np.memmap:
+    """
+    Open an image as a read-only memory map. ``.npy`` files are mapped directly;
+    other formats are decoded once with OpenCV (which needs the decoded image in
+    RAM for that moment) and spilled to a ``.npy`` file in ``work_dir``.
+    """
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    image = cv2.imread(path)
+    if image is None:
+        raise FileNotFoundError(f"Image not found at path: {path}")
+    mapped = create_memmap(image.shape, image.dtype, work_dir=work_dir)
+    mapped[...] = image
+    mapped.flush()
+    del image
+    return np.load(mapped.filename, mmap_mode="r")
+
+
+def iter_tiles(shape: tuple, tile: int):
+    """Yield (y0, y1, x0, x1) covering an image of ``shape`` in tile x tile blocks."""
+    h, w = shape[:2]
+    for y0 in range(0, h, tile):
+        for x0 in range(0, w, tile):
+            yield y0, min(y0 + tile, h), x0, min(x0 + tile, w)
+
+
+def process_tiled(src: np.ndarray, func, halo: int = 0, tile: int = DEFAULT_TILE,
+                  out: np.ndarray = None, work_dir: str = None) -> np.ndarray:
+    """
+    Apply ``func(tile_array) -> array`` over ``src`` tile by tile.
+
+    Each tile is read with ``halo`` extra pixels on every side (clamped at the
+    image border, where ``func`` applies its own border handling exactly as it
+    would on the whole image) and the halo is cropped from the result. The output
+    goes to ``out`` or to a new temporary memory map sized from the first tile.
+    """
+    h, w = src.shape[:2]
+    for y0, y1, x0, x1 in iter_tiles(src.shape, tile):
+        ty0, tx0 = max(y0 - halo, 0), max(x0 - halo, 0)
+        ty1, tx1 = min(y1 + halo, h), min(x1 + halo, w)
+        result = func(np.asarray(src[ty0:ty1, tx0:tx1]))
+        result = result[y0 - ty0:y0 - ty0 + (y1 - y0), x0 - tx0:x0 - tx0 + (x1 - x0)]
+        if out is None:
+            out = create_memmap((h, w) + result.shape[2:], result.dtype, work_dir=work_dir)
+        out[y0:y1, x0:x1] = result
+    return out
+
+
+def minmax_tiled(src: np.ndarray, tile: int = DEFAULT_TILE) -> tuple:
+    lo, hi = np.inf, -np.inf
+    for y0, y1, x0, x1 in iter_tiles(src.shape, tile):
+        block = src[y0:y1, x0:x1]
+        lo, hi = min(lo, block.min()), max(hi, block.max())
+    return lo, hi
+
+
+def normalize_tiled(src: np.ndarray, tile: int = DEFAULT_TILE, work_dir: str = None) -> np.ndarray:
+    """Two-pass ``normalize_image``: global min / max first, then the same scaling on every tile."""
+    lo, hi = minmax_tiled(src, tile)
+    return process_tiled(src, lambda t: stretch_range(t, lo, hi), 0, tile, work_dir=work_dir)
+
+
+def equalize_tiled(src: np.ndarray, tile: int = DEFAULT_TILE, work_dir: str = None) -> np.ndarray:
+    """Two-pass ``Histogram.equalize_gray``: accumulate the histogram over tiles, then apply its LUT."""
+    gray = process_tiled(src, _as_gray, 0, tile, work_dir=work_dir) if src.ndim == 3 else src
+    hist = np.zeros(256, dtype=np.float64)
+    for y0, y1, x0, x1 in iter_tiles(gray.shape, tile):
+        hist += cv2.calcHist([np.ascontiguousarray(gray[y0:y1, x0:x1])], [0], None, [256], [0, 256]).ravel()
+    cdf = hist.cumsum()
+    lookup_table = (cdf / cdf[-1] * 255).astype(np.uint8)
+    return process_tiled(gray, lambda t: lookup_table[t], 0, tile, work_dir=work_dir)
+
+
+def tile_halo(name: str, params: dict):
+    """Pixels of context a local operation needs around each tile; None if it is not local."""
+    if name in ("gray", "noise"):
+        return 0
+    if name == "filter":
+        return filter_radius(params.get("filter_type", "Average (3x3)"), params.get("kernel_size"))
+    if name == "edges" and params.get("method", "Sobel") != "Canny":
+        return 1
+    return None
+
+
+def check_tileable(chain: list):
+    """Raise ValueError if ``chain`` cannot run tiled (whole-image operations, bad filter sizes)."""
+    for name, params in chain:
+        if name not in ("normalize", "equalize") and tile_halo(name, params) is None:
+            raise ValueError(f"Operation {name!r} needs the whole image and cannot run tiled")
+
+
+def run_chain_tiled(src: np.ndarray, chain: list, tile: int = DEFAULT_TILE, work_dir: str = None) -> np.ndarray:
+    """
+    Tiled equivalent of ``operations.run_chain``. Consecutive local operations are
+    fused into one tiled pass whose halo is the sum of theirs; normalize and
+    equalize (and the normalization step of edges) run as two-pass global steps.
+    """
+    check_tileable(chain)
+    pending, halo = [], 0
+
+    def flush(image):
+        nonlocal pending, halo
+        if pending:
+            steps, index = list(pending), itertools.count()     # tiles are visited in a fixed order
+            image = process_tiled(image, lambda t: _run_local(t, steps, next(index)), halo, tile,
+                                  work_dir=work_dir)
+        pending, halo = [], 0
+        return image
+
+    image = src
+    for name, params in chain:
+        if name == "normalize":
+            image = normalize_tiled(flush(image), tile, work_dir)
+        elif name == "equalize":
+            image = equalize_tiled(flush(image), tile, work_dir)
+        elif name == "edges" and tile_halo(name, params) is not None:
+            pending.append(("edge_magnitude", params))
+            halo += 1
+            image = normalize_tiled(flush(image), tile, work_dir)
+        elif name == "noise":
+            # noise drawn for a halo would differ from the noise of the tile that owns
+            # those pixels, so noise ends a fused pass instead of feeding later kernels
+            pending.append((name, params))
+            image = flush(image)
+        else:
+            pending.append((name, params))
+            halo += tile_halo(name, params)
+    return flush(image)
+
+
+def _run_local(tile_array: np.ndarray, steps: list, index: int) -> np.ndarray:
+    for name, params in steps:
+        if name == "edge_magnitude":
+            tile_array = edge_magnitude(tile_array, params.get("method", "Sobel")).astype(np.float32)
+        elif name == "noise":
+            # one seed per tile, derived from the user's seed (reproducible) or fresh without one;
+            # the user's seed itself would repeat the same pattern in every equally sized tile
+            seed = params.get("seed")
+            tile_array = add_noise(tile_array, params.get("noise_type", "Gaussian"), float(params.get("amount", 0.1)),
+                                   seed=None if seed is None else [*np.atleast_1d(seed).tolist(), index],
+                                   cache=False)
+        else:
+            tile_array = OPERATIONS[name](tile_array, **params)
+    return tile_array
@@ -0,0 +1,240 @@
+"""
+Video and frame-sequence processing.
+
+Frames are decoded on a reader thread, processed on a pool of worker threads
+(numpy and OpenCV release the GIL for the heavy work) and encoded on a writer
+thread. Stages are connected by a bounded queue and a reorder buffer, and the
+number of frames in flight is capped, so memory stays flat however long the
+input is. Frames are written strictly in input order. Noise nodes without an
+explicit seed are seeded with the frame index, so the output does not depend on
+how frames were scheduled; those per-frame fields bypass the noise-field cache.
+"""
+import glob
+import os
+import queue
+import threading
+import time
+
+import cv2
+from core.cache import LRUCache
+from core.pipeline import Pipeline
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".webm")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+_FOURCC = {".mp4": "mp4v", ".m4v": "mp4v", ".mov": "mp4v", ".avi": "XVID", ".mkv": "XVID", ".webm": "VP80"}
+DEFAULT_FPS = 25.0
+
+
+# ---- input ----
+
+def open_frames(source: str) -> tuple:
+    """
+    (frame iterator, fps) for a video file, a printf-style pattern
+    (``frames/%04d.png``), a glob pattern or a directory of images.
+    """
+    if os.path.isdir(source) or any(ch in source for ch in "*?["):
+        pattern = os.path.join(source, "*") if os.path.isdir(source) else source
+        paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(IMAGE_EXTENSIONS))
+        if not paths:
+            raise FileNotFoundError(f"No frames found for {source!r}")
+        return _read_images(paths), DEFAULT_FPS
+
+    capture = cv2.VideoCapture(source)      # also handles printf patterns
+    if not capture.isOpened():
+        raise FileNotFoundError(f"Could not open video or frame sequence: {source}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    return _read_capture(capture), fps
+
+
+def _read_images(paths):
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise FileNotFoundError(f"Image not found at path: {path}")
+        yield frame
+
+
+def _read_capture(capture):
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield frame
+    finally:
+        capture.release()
+
+
+# ---- output ----
+
+class FrameWriter:
+    """
+    Writes frames to a video file (by extension), a printf-style pattern or a
+    directory (``000000.png``, ...). Video writers are opened on the first frame,
+    when the frame size and colour mode are known.
+    """
+
+    def __init__(self, output: str, fps: float):
+        self.output = output
+        self.fps = fps
+        self._video = None
+        self._index = 0
+        ext = os.path.splitext(output)[1].lower()
+        self._is_video = ext in VIDEO_EXTENSIONS and "%" not in output
+        if not self._is_video and "%" not in output:
+            os.makedirs(output, exist_ok=True)
+
+    def write(self, frame):
+        if self._is_video:
+            if self._video is None:
+                ext = os.path.splitext(self.output)[1].lower()
+                h, w = frame.shape[:2]
+                self._video = cv2.VideoWriter(self.output, cv2.VideoWriter_fourcc(*_FOURCC[ext]),
+                                              self.fps, (w, h), frame.ndim == 3)
+                if not self._video.isOpened():
+                    raise OSError(f"Could not open video writer for {self.output}")
+            self._video.write(frame)
+        else:
+            if "%" in self.output:
+                path = self.output % self._index
+            else:
+                path = os.path.join(self.output, f"{self._index:06d}.png")
+            if not cv2.imwrite(path, frame):
+                raise OSError(f"Could not write {path}")
+        self._index += 1
+
+    def close(self):
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+
+
+# ---- processing ----
+
+def _frame_pipeline(definition: dict) -> tuple:
+    """Per-worker pipeline (no result cache: frames never repeat) and its unseeded noise nodes."""
+    pipeline = Pipeline.from_dict(definition, cache=LRUCache(max_bytes=0))
+    unseeded = [n["name"] for n in definition["nodes"] if n["op"] == "noise" and "seed" not in n.get("params", {})]
+    return pipeline, unseeded
+
+
+def process_frames(source: str, output: str, definition: dict, workers: int = None,
+                   max_in_flight: int = None, progress=None) -> dict:
+    """
+    Run the pipeline ``definition`` (``Pipeline.to_dict()``) over every frame of
+    ``source`` and write the results to ``output``. At most ``max_in_flight``
+    frames (default: two per worker plus two) exist at any time between decoding
+    and encoding. ``progress(frames_written, seconds)`` is called after every frame.
+    Returns throughput statistics, including the time each stage spent working.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers + 2
+    frames, fps = open_frames(source)
+    writer = FrameWriter(output, fps)
+
+    tasks = queue.Queue(maxsize=max_in_flight + workers)    # room for the end markers too
+    slots = threading.Semaphore(max_in_flight)
+    done = {}                       # frame index → processed frame (reorder buffer)
+    done_changed = threading.Condition()
+    stop = threading.Event()
+    errors = []
+    state = {"total": None, "decode": 0.0, "process": 0.0, "encode": 0.0, "pixels": 0}
+
+    def fail(exc):
+        errors.append(exc)
+        stop.set()
+        with done_changed:
+            done_changed.notify_all()
+
+    def read():
+        count = 0
+        try:
+            iterator = iter(frames)
+            while not stop.is_set():
+                slots.acquire()
+                start = time.perf_counter()
+                frame = next(iterator, None)
+                state["decode"] += time.perf_counter() - start
+                if frame is None:
+                    slots.release()
+                    break
+                tasks.put((count, frame))
+                count += 1
+        except Exception as exc:
+            fail(exc)
+        finally:
+            with done_changed:
+                state["total"] = count
+                done_changed.notify_all()
+            for _ in range(workers):
+                tasks.put(None)
+
+    def work():
+        pipeline, unseeded = _frame_pipeline(definition)
+        while True:
+            task = tasks.get()
+            if task is None or stop.is_set():
+                return
+            index, frame = task
+            try:
+                start = time.perf_counter()
+                for name in unseeded:
+                    # a field per frame index is never reused: keep it out of the shared cache
+                    pipeline.set_params(name, seed=index, cache=False)
+                pipeline.set_source(frame)
+                result = pipeline.result()
+                with done_changed:
+                    state["process"] += time.perf_counter() - start
+                    state["pixels"] += frame.shape[0] * frame.shape[1]
+                    done[index] = result
+                    done_changed.notify_all()
+            except Exception as exc:
+                fail(exc)
+                return
+
+    threads = [threading.Thread(target=read, name="video-reader", daemon=True)]
+    threads += [threading.Thread(target=work, name=f"video-worker-{i}", daemon=True) for i in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    # writer: this thread, strictly in frame order
+    written = 0
+    try:
+        while True:
+            with done_changed:
+                while written not in done and not stop.is_set() and state["total"] != written:
+                    done_changed.wait()
+                if stop.is_set() or (written not in done and state["total"] == written):
+                    break
+                frame = done.pop(written)
+            t = time.perf_counter()
+            writer.write(frame)
+            state["encode"] += time.perf_counter() - t
+            slots.release()
+            written += 1
+            if progress is not None:
+                progress(written, time.perf_counter() - start)
+    except Exception as exc:
+        fail(exc)
+    finally:
+        stop.set()
+        for _ in threads:           # unblock a reader waiting for a slot
+            slots.release()
+        writer.close()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    if errors:
+        raise errors[0]
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": written,
+        "seconds": elapsed,
+        "fps": written / elapsed if elapsed > 0 else 0.0,
+        "mp_per_s": state["pixels"] / 1e6 / elapsed if elapsed > 0 else 0.0,
+        "workers": workers,
+        "decode_seconds": state["decode"],
+        "process_seconds": state["process"],
+        "encode_seconds": state["encode"],
+    }
@@ -14,8 +14,14 @@ if __name__ == "__main__":
     window.setStyleSheet(load_stylesheet('dark.qss'))
 
     controller = MainController(window)
-    hybrid_controller = HybridController(window)
-    noise_controller = NoiseController(window, controller.manager)
+    hybrid_controller = HybridController(window, controller.scheduler)
+    noise_controller = NoiseController(window, controller.manager, controller.scheduler)
+    controller.tab_histories[window.tab_2] = noise_controller.history
+    controller.tab_histories[window.tab_4] = hybrid_controller.history
+    controller.busy_indicator.track("noise", window.tab_2)
+    controller.busy_indicator.track("filter", window.tab_2)
+    for channel in ("hybrid", "hybrid image 1", "hybrid image 2"):
+        controller.busy_indicator.track(channel, window.tab_4)
 
     # Set default tab to Input tab (index 0)
     window.tabWidget.setCurrentIndex(0)
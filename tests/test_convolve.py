@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from core.image_manager import ImageManager
+from core.filters import average_filter, box_filter, fast_gaussian_filter, gaussian_kernel, gaussian_sigma, _box_widths
+
+
+def reference_convolve(image, kernel):
+    """Direct 2-D convolution over an edge-padded image, one tap at a time."""
+    k_h, k_w = kernel.shape
+    pad = [((k_h - 1) // 2, k_h // 2), ((k_w - 1) // 2, k_w // 2)] + [(0, 0)] * (image.ndim - 2)
+    padded = np.pad(image.astype(np.float64), pad, mode="edge")
+    flipped = kernel[::-1, ::-1]
+    h, w = image.shape[:2]
+    out = np.zeros(image.shape, dtype=np.float64)
+    for i in range(k_h):
+        for j in range(k_w):
+            out += flipped[i, j] * padded[i:i + h, j:j + w]
+    return out
+
+
+def reference_box_sum(image, width):
+    r = width // 2
+    pad = [(r, r), (r, r)] + [(0, 0)] * (image.ndim - 2)
+    padded = np.pad(image.astype(np.int64), pad, mode="edge")
+    h, w = image.shape[:2]
+    return sum(padded[i:i + h, j:j + w] for i in range(width) for j in range(width))
+
+
+KERNELS = {
+    "separable 5x5": gaussian_kernel(5),
+    "separable 3x7": np.outer([1.0, 2.0, 1.0], np.arange(1.0, 8.0)),
+    "non-separable 3x3": np.array([[0.0, -1.0, 0.0], [-1.0, 5.0, -1.0], [0.0, -1.0, 0.5]]),
+    "even 4x2": np.arange(8.0).reshape(4, 2) - 3.0,
+}
+
+
+@pytest.mark.parametrize("name", KERNELS)
+@pytest.mark.parametrize("method", ["direct", "fft"])
+def test_gray_convolve_matches_reference(name, method):
+    image = np.random.default_rng(1).integers(0, 256, (21, 26)).astype(np.uint8)
+    kernel = KERNELS[name]
+    result = ImageManager.convolve(image, kernel, method=method)
+    np.testing.assert_allclose(result, reference_convolve(image, kernel), atol=1e-8)
+
+
+def test_separable_pair_matches_outer_product():
+    image = np.random.default_rng(2).integers(0, 256, (17, 15)).astype(np.uint8)
+    column, row = np.array([1.0, 4.0, 6.0, 4.0, 1.0]), np.array([1.0, 0.0, -1.0])
+    result = ImageManager.convolve(image, (column, row), method="direct")
+    np.testing.assert_allclose(result, reference_convolve(image, np.outer(column, row)), atol=1e-9)
+
+
+@pytest.mark.parametrize("method", ["direct", "fft"])
+def test_colour_convolve_clips_without_touching_out(method):
+    image = np.random.default_rng(3).integers(0, 256, (14, 19, 3)).astype(np.uint8)
+    kernel = KERNELS["non-separable 3x3"]
+    out = np.empty(image.shape, dtype=np.float64)
+    result = ImageManager.convolve(image, kernel, method=method, out=out)
+    expected = reference_convolve(image, kernel)
+    assert result.dtype == np.uint8
+    np.testing.assert_allclose(out, expected, atol=1e-8)      # raw values, not clipped
+    assert np.abs(result.astype(int) - np.clip(expected, 0, 255).astype(int)).max() <= 1
+
+
+@pytest.mark.parametrize("shape", [(18, 25), (16, 13, 3), (9, 11, 2)])
+@pytest.mark.parametrize("size", [1, 3, 7])
+def test_box_filter_is_exact_floor_of_mean(shape, size):
+    image = np.random.default_rng(size).integers(0, 256, shape).astype(np.uint8)
+    expected = reference_box_sum(image, size) // (size * size)
+    result = average_filter(image, size)
+    if image.ndim == 2:
+        result = np.floor(result)
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("size", [5, 9, 21])
+def test_fast_gaussian_matches_cascaded_boxes(size):
+    image = np.random.default_rng(size).integers(0, 256, (30, 27, 3)).astype(np.uint8)
+    expected = image.astype(np.int64)
+    widths = _box_widths(gaussian_sigma(size))
+    for width in widths:
+        expected = reference_box_sum(expected, width)
+    expected = expected / np.prod([width * width for width in widths])
+    np.testing.assert_array_equal(fast_gaussian_filter(image, size), expected.astype(np.uint8))
+    np.testing.assert_array_equal(box_filter(image, 3, passes=2),
+                                  (reference_box_sum(reference_box_sum(image, 3), 3) / 81).astype(np.uint8))
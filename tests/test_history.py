@@ -0,0 +1,39 @@
+import numpy as np
+from core.history import History
+
+
+def test_compacted_states_round_trip():
+    rng = np.random.default_rng(0)
+    first = rng.integers(0, 256, (40, 50, 3)).astype(np.uint8)
+    states = [first]
+    for i in range(6):
+        edited = states[-1].copy()
+        edited[i * 5:i * 5 + 5] += 1               # small edits: stored as compressed deltas
+        states.append(edited)
+    # room for about two full states: the others must be compacted and rebuilt
+    history = History(max_bytes=2 * first.nbytes + 4096)
+    history.reset(first)
+    for state in states[1:]:
+        history.push(state, "edit")
+    assert history.stats()["deltas"] > 0
+
+    for expected in reversed(states[:-1]):
+        np.testing.assert_array_equal(history.undo(), expected)
+    for expected in states[1:]:
+        np.testing.assert_array_equal(history.redo(), expected)
+    for index, expected in enumerate(states):
+        np.testing.assert_array_equal(history.state(index), expected)
+
+
+def test_recipe_states_are_recomputed():
+    first = np.arange(60, dtype=np.uint8).reshape(6, 10)
+    # room for the first and the current state only: the others keep just their recipe
+    history = History(max_bytes=2 * first.nbytes)
+    history.reset(first)
+    for _ in range(4):
+        previous = history.current()
+        history.push(255 - previous, "invert", lambda image: 255 - image)
+    assert len(history) == 5 and history.stats()["recipes"] == 3
+    for index in range(5):
+        expected = first if index % 2 == 0 else 255 - first
+        np.testing.assert_array_equal(history.state(index), expected)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+from core import median
+from core.median import median_filter
+
+
+def reference_median(image, size):
+    """Sort every edge-padded window: slow, obviously right."""
+    pad = size // 2
+    image3 = image[:, :, None] if image.ndim == 2 else image
+    padded = np.pad(image3, ((pad, pad), (pad, pad), (0, 0)), mode="edge")
+    windows = sliding_window_view(padded, (size, size), axis=(0, 1))
+    values = np.sort(windows.reshape(image3.shape[:3] + (size * size,)), axis=-1)
+    result = values[..., size * size // 2]
+    return result[:, :, 0] if image.ndim == 2 else result
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32, np.int16, np.float64])
+@pytest.mark.parametrize("shape", [(19, 23), (13, 17, 3), (11, 9, 2), (9, 12, 4)])
+@pytest.mark.parametrize("size", [3, 5, 7, 9])
+def test_median_matches_reference(dtype, shape, size):
+    rng = np.random.default_rng(size)
+    image = (rng.random(shape) * 250).astype(dtype)
+    result = median_filter(image, size)
+    assert result.dtype == image.dtype and result.shape == image.shape
+    np.testing.assert_array_equal(result, reference_median(image, size))
+
+
+def test_selection_path_matches_reference():
+    # windows above the network size fall back to selection for non-cv2 dtypes
+    size = median.NETWORK_MAX_SIZE + 2
+    image = np.random.default_rng(0).integers(-500, 500, (15, 16, 3)).astype(np.int16)
+    np.testing.assert_array_equal(median_filter(image, size), reference_median(image, size))
+
+
+def test_size_one_is_a_copy():
+    image = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    result = median_filter(image, 1)
+    np.testing.assert_array_equal(result, image)
+    assert result is not image
+
+
+@pytest.mark.parametrize("size", [0, 2, -3])
+def test_invalid_size(size):
+    with pytest.raises(ValueError):
+        median_filter(np.zeros((4, 4), np.uint8), size)